@@ -0,0 +1,187 @@
+"""Benchmark headless untuk konverter XML <-> CSV.
+
+Membuat dokumen sintetis berbentuk multiShipmentOrder (seperti profiles/Transmart.json), lalu mengukur
+xml_to_csv_logic, extract_value per tipe kolom, csv_to_xml_logic dan deteksi skema. Hasil ditulis ke JSON
+dan bisa dibandingkan dengan hasil sebelumnya:
+
+    python benchmark.py --files 200 --items 50 --out bench.json
+    python benchmark.py --files 200 --items 50 --out bench_baru.json --compare bench.json
+"""
+import os
+import sys
+import re
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import xmltocsv_engine as engine
+
+NAMESPACE = "urn:ean.ucc:order:2"
+
+# --- Generator data sintetis ---
+def _order_xml(rng, order_no, items_per_order, optional_ratio):
+    parts = ['<multiShipmentOrder documentStatus="ORIGINAL">',
+             f'<creationDateTime>2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00</creationDateTime>',
+             f'<uniqueCreatorIdentification>PO{order_no:08d}</uniqueCreatorIdentification>',
+             '<seller><additionalPartyIdentification><additionalPartyIdentificationValue>SUP%05d</additionalPartyIdentificationValue>'
+             '<additionalPartyIdentificationType>SELLER_ASSIGNED_IDENTIFIER_FOR_A_PARTY</additionalPartyIdentificationType></additionalPartyIdentification></seller>' % rng.randint(1, 99999),
+             '<buyer><additionalPartyIdentification><additionalPartyIdentificationValue>TRM%03d</additionalPartyIdentificationValue>'
+             '<additionalPartyIdentificationType>FOR_INTERNAL_USE_11</additionalPartyIdentificationType></additionalPartyIdentification></buyer>' % rng.randint(1, 999),
+             '<shipToLogistics><shipTo><additionalPartyIdentification><additionalPartyIdentificationValue>STORE%04d</additionalPartyIdentificationValue>'
+             '</additionalPartyIdentification></shipTo></shipToLogistics>' % rng.randint(1, 9999)]
+    if rng.random() < optional_ratio: parts.append(f'<orderNote>Catatan {order_no}</orderNote>')
+    for item_no in range(1, items_per_order + 1):
+        unit_price = rng.randint(1000, 500000) / 100; quantity = rng.randint(1, 240)
+        identifications = "".join(f'<additionalTradeItemIdentification><additionalTradeItemIdentificationValue>{value}</additionalTradeItemIdentificationValue>'
+                                  f'<additionalTradeItemIdentificationType>T{k}</additionalTradeItemIdentificationType></additionalTradeItemIdentification>'
+                                  for k, value in enumerate([f"BRG{rng.randint(1, 10**6):07d}", f"Barang {rng.randint(1, 9999)}", "PCS", "1", "", "", "", "", str(quantity)]))
+        optional = f'<promotion><discountAmount>{rng.randint(1, 999)}.00</discountAmount></promotion>' if rng.random() < optional_ratio else ""
+        parts.append(f'<multiShipmentOrderLineItem number="{item_no}"><tradeItemIdentification><gtin>{rng.randint(10**12, 10**13 - 1)}</gtin>{identifications}</tradeItemIdentification>'
+                     f'<requestedQuantity>{quantity}</requestedQuantity><netPrice><amount><monetaryAmount>{unit_price:.2f}</monetaryAmount></amount></netPrice>'
+                     f'<netAmount><amount><monetaryAmount>{unit_price * quantity:.2f}</monetaryAmount></amount></netAmount>{optional}</multiShipmentOrderLineItem>')
+    parts.append('</multiShipmentOrder>')
+    return "".join(parts)
+
+def generate_dataset(out_dir, files=50, orders_per_file=1, items_per_order=40, optional_ratio=0.3, namespace=False, seed=1):
+    """Menulis file XML sintetis ke out_dir dan mengembalikan daftar path-nya."""
+    rng = random.Random(seed); os.makedirs(out_dir, exist_ok=True); paths = []; order_no = 0
+    for file_no in range(files):
+        orders = []
+        for _ in range(orders_per_file): orders.append(_order_xml(rng, order_no, items_per_order, optional_ratio)); order_no += 1
+        body = orders[0] if orders_per_file == 1 else f"<multiShipmentOrderMessage>{''.join(orders)}</multiShipmentOrderMessage>"
+        if namespace: body = body.replace(body[:body.index(">")], body[:body.index(">")] + f' xmlns="{NAMESPACE}"', 1)
+        path = os.path.join(out_dir, f"order_{file_no:05d}.xml")
+        with open(path, "w", encoding="utf-8") as f: f.write('<?xml version="1.0" encoding="UTF-8"?>\n' + body)
+        paths.append(path)
+    return paths
+
+# Nama tag di path ElementPath (bukan atribut, bukan teks di dalam tanda kutip predikat)
+_TAG_PATTERN = re.compile(r"""('[^']*'|"[^"]*")|(?<![@{}\w.:-])([A-Za-z_][\w.-]*)""")
+
+def namespace_profile(config, namespace=NAMESPACE):
+    """Salinan profil dengan setiap tag di item_loop_path dan path kolom xpath diberi `{namespace}`, untuk data --namespace."""
+    qualify = lambda path: _TAG_PATTERN.sub(lambda m: m.group(1) or f"{{{namespace}}}{m.group(2)}", path)
+    config = json.loads(json.dumps(config)); settings = config["settings"]
+    if settings.get("item_loop_path"): settings["item_loop_path"] = qualify(settings["item_loop_path"])
+    for details in config["columns"].values():
+        if details.get("type") in ("xpath", "xpath_indexed") and details.get("path"): details["path"] = qualify(details["path"])
+    return config
+
+# --- Pengukuran ---
+def _peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def measure(func, items=0, bytes_processed=0, repeat=1):
+    """Menjalankan func `repeat` kali; mengembalikan waktu terbaik, throughput dan puncak memori.
+
+    Waktu diukur tanpa tracemalloc (overhead-nya besar); puncak memori Python diukur pada satu putaran tambahan.
+    process_peak_rss_mb adalah puncak RSS proses sejak awal (ru_maxrss), jadi hanya naik dari benchmark ke benchmark.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter(); func(); elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    try: func(); peak_python = tracemalloc.get_traced_memory()[1]
+    finally: tracemalloc.stop()
+    best = max(best, 1e-9)
+    return {"seconds": round(best, 4), "items_per_sec": round(items / best, 1), "mb_per_sec": round(bytes_processed / best / 1024 / 1024, 2),
+            "peak_python_mb": round(peak_python / 1024 / 1024, 1), "process_peak_rss_mb": _peak_rss_mb()}
+
+def run_benchmarks(xml_files, config, work_dir, repeat=1, streaming=False, workers=1, backend=None):
+    results = {}
+    total_bytes = sum(os.path.getsize(f) for f in xml_files)
+    item_loop_path = config["settings"].get("item_loop_path", ".")
+    roots = [ET.parse(f).getroot() for f in xml_files]
+    items = [(root, item) for root in roots for item in root.findall(item_loop_path)]
+    # Tanpa item semua angka throughput jadi 0 dan --compare tidak bermakna (mis. profil tanpa namespace untuk data --namespace)
+    if not items: raise ValueError(f"item_loop_path '{item_loop_path}' tidak menemukan item di data benchmark.")
+    output_csv = os.path.join(work_dir, "bench.csv")
+
+    results["xml_to_csv_logic"] = measure(lambda: engine.xml_to_csv(xml_files, output_csv, config, streaming=streaming, workers=workers, backend=backend), len(items), total_bytes, repeat)
+
+    columns = config["columns"]
+    for col_type in ["xpath", "attribute", "xpath_indexed", "calculated"]:
+        selected = [(name, details) for name, details in columns.items() if details.get("type") == col_type]
+        if not selected: continue
+        row_data = {name: "12.50" for name in columns}
+        def run(selected=selected, col_type=col_type):
+            for root, item in items:
+                for _, details in selected:
+                    if col_type == "calculated": engine.extract_value(None, details, row_data)
+                    else: engine.extract_value(root if details.get("source") == "root" else item, details)
+        results[f"extract_value[{col_type}]"] = measure(run, len(items) * len(selected), 0, repeat)
+
+    plan = engine.compile_profile(config, backend=backend); find_items = plan.backend.compile_findall(item_loop_path)
+    plan_roots = roots if plan.backend.name == "etree" else [plan.backend.parse(f) for f in xml_files]
+    def run_plan():
+        for root in plan_roots:
+            root_data = plan.extract_root(root)
+            plan.finish_rows([plan.extract_item(item) for item in find_items(root)], root_data)
+    results["extraction_plan"] = measure(run_plan, len(items), 0, repeat)
+
+    xml_config = json.loads(json.dumps(config)); xml_config["settings"].setdefault("xml_grouping_key", "Order Number"); xml_config["settings"].setdefault("root_element_name", "multiShipmentOrder")
+    if xml_config["settings"]["xml_grouping_key"] in columns:
+        output_dir = os.path.join(work_dir, "xml_out"); os.makedirs(output_dir, exist_ok=True)
+        results["csv_to_xml_logic"] = measure(lambda: engine.csv_to_xml(output_csv, output_dir, xml_config), len(items), os.path.getsize(output_csv), repeat)
+
+    results["_recursive_detect"] = measure(lambda: [engine.recursive_detect(root, ".", set()) for root in roots], len(items), total_bytes, repeat)
+    results["SchemaDetector"] = measure(lambda: engine.SchemaDetector().add_files(xml_files, sample_size=0), len(items), total_bytes, repeat)
+    return results
+
+def compare(current, previous):
+    lines = [f"{'benchmark':<28}{'sebelum (s)':>14}{'sekarang (s)':>14}{'perubahan':>12}"]
+    for name, result in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old: lines.append(f"{name:<28}{'-':>14}{result['seconds']:>14.4f}{'baru':>12}"); continue
+        change = (result["seconds"] - old["seconds"]) / old["seconds"] * 100 if old["seconds"] else 0.0
+        lines.append(f"{name:<28}{old['seconds']:>14.4f}{result['seconds']:>14.4f}{change:>+11.1f}%")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark konverter XML <-> CSV dengan data sintetis.")
+    parser.add_argument("--files", type=int, default=50); parser.add_argument("--orders", type=int, default=1, help="order per file")
+    parser.add_argument("--items", type=int, default=40, help="item per order"); parser.add_argument("--optional", type=float, default=0.3, help="peluang elemen opsional muncul")
+    parser.add_argument("--namespace", action="store_true", help="pakai default namespace XML"); parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--profile", help="file profil JSON (default: profil bawaan)"); parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--streaming", action="store_true"); parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--backend", choices=engine.XML_BACKENDS, help="parser XML untuk konversi (default: dari profil)")
+    parser.add_argument("--out", default="bench_results.json"); parser.add_argument("--compare", help="file JSON hasil sebelumnya")
+    parser.add_argument("--workdir", help="folder kerja (default: folder sementara)")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        with open(args.profile, "r", encoding="utf-8") as f: config = json.load(f)
+    else: config = engine.get_default_profile_config()
+    if args.namespace: config = namespace_profile(config)
+    with tempfile.TemporaryDirectory(prefix="xmltocsv_bench_") as tmp_dir:
+        work_dir = args.workdir or tmp_dir
+        xml_files = generate_dataset(os.path.join(work_dir, "xml"), args.files, args.orders, args.items, args.optional, args.namespace, args.seed)
+        results = run_benchmarks(xml_files, config, work_dir, args.repeat, args.streaming, args.workers, args.backend)
+    report = {"meta": {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "platform": platform.platform(),
+                       "files": args.files, "orders_per_file": args.orders, "items_per_order": args.items, "optional_ratio": args.optional,
+                       "namespace": args.namespace, "profile": args.profile or "default", "streaming": args.streaming, "workers": args.workers,
+                       "backend": engine.compile_profile(config, backend=args.backend).backend.name,
+                       "process_peak_rss_mb": "puncak RSS proses sejak awal (ru_maxrss), bukan per benchmark"},
+              "results": results}
+    with open(args.out, "w", encoding="utf-8") as f: json.dump(report, f, indent=4)
+    for name, result in results.items(): print(f"{name:<28}{result['seconds']:>10.4f}s {result['items_per_sec']:>12.1f} item/s {result['mb_per_sec']:>8.2f} MB/s")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f: print("\n" + compare(report, json.load(f)))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
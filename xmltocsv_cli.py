@@ -0,0 +1,128 @@
+"""Antarmuka baris perintah untuk konversi tanpa GUI (tidak meng-import PyQt6).
+
+    python xmltocsv_cli.py xml2csv --profile profiles/Transmart.json --out orders.csv inputs/*.xml
+    python xmltocsv_cli.py xml2csv --profile profiles/Transmart.json --out orders.csv --member-glob "PO_*.xml" bundle.zip arsip/
+    python xmltocsv_cli.py csv2xml --profile profiles/default.json --out-dir hasil_xml orders.csv
+    python xmltocsv_cli.py multi --profile Transmart --profile ringkasan --out-dir hasil inputs/*.xml
+
+Subcommand `xml2csv` boleh dihilangkan: argumen tanpa subcommand dianggap xml2csv.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+
+from xmltocsv_engine import PROFILE_DIR, PROFILE_EXTENSION, OUTPUT_FORMATS, XML_BACKENDS, ConversionMetrics, load_profile, load_profiles, resolve_output_format, xml_to_csv, xml_to_csv_multi, csv_to_xml
+
+COMMANDS = ("xml2csv", "csv2xml", "multi")
+
+def _expand_inputs(patterns):
+    # Shell Windows tidak mengembangkan wildcard, jadi glob dilakukan di sini juga
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        files.extend(matches)
+    return files
+
+def _load_multi_profiles(args):
+    # --profile boleh berupa path file atau nama profil di --profiles-dir; tanpa --profile semua profil di folder dipakai
+    if not args.profiles: return load_profiles(args.profiles_dir)
+    return [(os.path.splitext(os.path.basename(p))[0], load_profile(p)) if os.path.isfile(p) else load_profiles(args.profiles_dir, [p])[0] for p in args.profiles]
+
+def _multi_jobs(profiles, out_dir, output_format):
+    jobs = []
+    for name, config in profiles:
+        extension = "." + resolve_output_format(f"{name}.csv", config.get("settings", {}), output_format)
+        jobs.append((config, os.path.join(out_dir, name + extension)))
+    return jobs
+
+def _progress_printer(quiet):
+    started = time.monotonic()
+    def progress(files_done, files_total, rows_done):
+        if quiet: return
+        elapsed = max(time.monotonic() - started, 1e-6); total = f"/{files_total}" if files_total > 0 else ""
+        print(f"\r{files_done}{total} file, {rows_done} baris, {rows_done / elapsed:.0f} baris/detik", end="", file=sys.stderr, flush=True)
+    return progress
+
+def _report_metrics(metrics, args):
+    if metrics is None: return
+    metrics.write_json(args.metrics)
+    if not args.quiet: print("\n" + metrics.summary_table() + f"\n\nLaporan metrics ditulis ke {args.metrics}", file=sys.stderr)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="xmltocsv_cli.py", description="Konverter XML <-> CSV berbasis profil (tanpa GUI).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    xml2csv = subparsers.add_parser("xml2csv", help="gabungkan file-file XML menjadi satu CSV")
+    xml2csv.add_argument("inputs", nargs="+", help="file XML, .zip, .gz atau folder (wildcard diperbolehkan)")
+    xml2csv.add_argument("--profile", required=True, help="file profil JSON"); xml2csv.add_argument("--out", required=True, help="file CSV output (.parquet = Parquet)")
+    xml2csv.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, help="format output (default: dari profil atau ekstensi --out)")
+    xml2csv.add_argument("--member-glob", help="filter nama anggota .zip/isi folder, mis. 'PO_*.xml' (tanpa '/' = nama file di subfolder mana pun; default: *.xml)")
+    xml2csv.add_argument("--streaming", action="store_true", default=None, help="baca XML bertahap (iterparse)")
+    xml2csv.add_argument("--backend", choices=XML_BACKENDS, help="parser XML (default: dari profil, 'auto' = lxml jika terpasang)")
+    xml2csv.add_argument("--workers", type=int, help="jumlah proses paralel (0 = semua core)"); xml2csv.add_argument("--chunk-size", type=int)
+    xml2csv.add_argument("--flush-rows", type=int); xml2csv.add_argument("--quiet", action="store_true")
+    xml2csv.add_argument("--metrics", metavar="REPORT.json", help="catat waktu per fase/file/kolom dan tulis laporan JSON")
+
+    multi = subparsers.add_parser("multi", help="beberapa profil sekaligus: tiap XML di-parse sekali, satu output per profil")
+    multi.add_argument("inputs", nargs="+", help="file XML, .zip, .gz atau folder (wildcard diperbolehkan)")
+    multi.add_argument("--profile", dest="profiles", action="append", help="file atau nama profil (boleh berulang; default: semua profil di --profiles-dir)")
+    multi.add_argument("--profiles-dir", default=PROFILE_DIR, help=f"folder profil (default: {PROFILE_DIR})")
+    multi.add_argument("--out-dir", required=True, help="folder output (<nama profil>.csv/.parquet)")
+    multi.add_argument("--format", dest="output_format", choices=OUTPUT_FORMATS, help="format output semua profil (default: dari tiap profil)")
+    multi.add_argument("--member-glob", help="filter nama anggota .zip/isi folder, tanpa '/' = nama file (default: *.xml)")
+    multi.add_argument("--streaming", action="store_true", default=None, help="baca XML bertahap (hanya jika semua profil memakai item_loop_path yang sama)")
+    multi.add_argument("--backend", choices=XML_BACKENDS, help="parser XML (default: dari profil pertama)")
+    multi.add_argument("--workers", type=int, help="jumlah proses paralel (0 = semua core)"); multi.add_argument("--chunk-size", type=int)
+    multi.add_argument("--flush-rows", type=int); multi.add_argument("--quiet", action="store_true")
+    multi.add_argument("--metrics", metavar="REPORT.json", help="catat waktu per fase/file/kolom dan tulis laporan JSON")
+
+    csv2xml = subparsers.add_parser("csv2xml", help="pecah CSV menjadi satu file XML per grup")
+    csv2xml.add_argument("input", help="file CSV")
+    csv2xml.add_argument("--profile", required=True, help="file profil JSON"); csv2xml.add_argument("--out-dir", required=True, help="folder output XML")
+    csv2xml.add_argument("--sorted", dest="input_sorted", action="store_true", default=None, help="CSV sudah terurut per xml_grouping_key")
+    csv2xml.add_argument("--external-sort", action="store_true", default=None, help="urutkan CSV lewat file sementara dulu")
+    csv2xml.add_argument("--workers", type=int, help="jumlah proses paralel (0 = semua core)"); csv2xml.add_argument("--quiet", action="store_true")
+    csv2xml.add_argument("--metrics", metavar="REPORT.json", help="catat waktu per fase/grup dan tulis laporan JSON")
+    return parser
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if argv and argv[0] not in COMMANDS and argv[0] not in ("-h", "--help"): argv.insert(0, "xml2csv")
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "multi": profiles = _load_multi_profiles(args)
+        else: config = load_profile(args.profile)
+    except (OSError, ValueError) as e: print(f"Gagal membaca profil: {e}", file=sys.stderr); return 2
+    if args.command == "multi" and not profiles: print(f"Tidak ada profil ({PROFILE_EXTENSION}) di {args.profiles_dir}.", file=sys.stderr); return 2
+    progress = _progress_printer(args.quiet); metrics = ConversionMetrics() if args.metrics else None
+    try:
+        if args.command == "xml2csv":
+            xml_files = _expand_inputs(args.inputs); failed_files = []
+            if not xml_files: print("Tidak ada file XML/arsip yang cocok.", file=sys.stderr); return 2
+            row_count = xml_to_csv(xml_files, args.out, config, streaming=args.streaming, flush_rows=args.flush_rows, workers=args.workers, chunk_size=args.chunk_size, errors=failed_files, progress=progress, metrics=metrics, output_format=args.output_format, backend=args.backend, member_glob=args.member_glob)
+            if not args.quiet: print(f"\n{row_count} baris dari {len(xml_files)} input ditulis ke {args.out}", file=sys.stderr)
+            _report_metrics(metrics, args)
+            for xml_file, error in failed_files: print(f"GAGAL {xml_file}: {error}", file=sys.stderr)
+            return 1 if failed_files else 0
+        if args.command == "multi":
+            xml_files = _expand_inputs(args.inputs); failed_files = []
+            if not xml_files: print("Tidak ada file XML/arsip yang cocok.", file=sys.stderr); return 2
+            os.makedirs(args.out_dir, exist_ok=True); jobs = _multi_jobs(profiles, args.out_dir, args.output_format)
+            row_counts = xml_to_csv_multi(xml_files, jobs, streaming=args.streaming, flush_rows=args.flush_rows, workers=args.workers, chunk_size=args.chunk_size, errors=failed_files, progress=progress, metrics=metrics, backend=args.backend, member_glob=args.member_glob)
+            if not args.quiet:
+                print("", file=sys.stderr)
+                for (_, output_file), row_count in zip(jobs, row_counts): print(f"{row_count} baris ditulis ke {output_file}", file=sys.stderr)
+            _report_metrics(metrics, args)
+            for xml_file, error in failed_files: print(f"GAGAL {xml_file}: {error}", file=sys.stderr)
+            return 1 if failed_files else 0
+        file_count = csv_to_xml(args.input, args.out_dir, config, progress=progress, input_sorted=args.input_sorted, external_sort=args.external_sort, workers=args.workers, metrics=metrics)
+        if not args.quiet: print(f"\n{file_count} file XML dibuat di {args.out_dir}", file=sys.stderr)
+        _report_metrics(metrics, args)
+        return 0
+    except Exception as e:
+        print(f"\nTerjadi kesalahan saat konversi: {e}", file=sys.stderr); return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
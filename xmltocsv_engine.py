@@ -0,0 +1,1448 @@
+"""Mesin konversi XML <-> CSV tanpa ketergantungan PyQt6.
+
+Dipakai oleh jendela GUI (xmltocsv.py) maupun CLI (xmltocsv_cli.py), dan bisa di-import langsung untuk job terjadwal.
+"""
+import os
+import re
+import sys
+import ast
+import math
+import json
+import gzip
+import time
+import fnmatch
+import zipfile
+import shutil
+import hashlib
+import heapq
+import random
+import tempfile
+import xml.etree.ElementTree as ET
+import csv
+from datetime import date, datetime, timezone
+from decimal import Context, Decimal, ROUND_HALF_UP
+from collections import defaultdict, deque
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import lru_cache
+from itertools import islice, groupby
+
+# --- FUNGSI GLOBAL & KONSTANTA ---
+PROFILE_DIR = "profiles"
+PROFILE_EXTENSION = ".json"
+
+def get_default_profile_config():
+    """Mengembalikan dictionary berisi konfigurasi profil default yang lengkap, termasuk untuk CSV->XML."""
+    return {
+        "settings": {
+            "item_loop_path": ".//multiShipmentOrderLineItem",
+            # --- BARU: Pengaturan untuk CSV ke XML ---
+            "root_element_name": "multiShipmentOrder",
+            "xml_grouping_key": "Order Number"
+        },
+        "columns": {
+            "Item Number": {"type": "attribute", "path": "number", "source": "item"},
+            "Order Date": {"type": "xpath", "path": ".//creationDateTime", "source": "root"},
+            "Order Number": {"type": "xpath", "path": ".//uniqueCreatorIdentification", "source": "root"},
+            "Kode Barang": {"type": "xpath_indexed", "path": ".//additionalTradeItemIdentification/additionalTradeItemIdentificationValue", "index": 0, "source": "item"},
+            "Item Description": {"type": "xpath_indexed", "path": ".//additionalTradeItemIdentification/additionalTradeItemIdentificationValue", "index": 1, "source": "item"},
+            "Quantity": {"type": "xpath_indexed", "path": ".//additionalTradeItemIdentification/additionalTradeItemIdentificationValue", "index": 8, "source": "item"},
+            "Unit Price": {"type": "xpath", "path": ".//netPrice/amount/monetaryAmount", "source": "item"},
+            "Total Price": {"type": "xpath", "path": ".//netAmount/amount/monetaryAmount", "source": "item"},
+            "Qty Barang": {"type": "calculated", "formula": "{Total Price}/{Unit Price}", "source": "item"},
+            "Ship to": {"type": "xpath", "path": ".//shipToLogistics/shipTo/additionalPartyIdentification/additionalPartyIdentificationValue", "source": "root"},
+            "GTIN": {"type": "xpath", "path": ".//gtin", "source": "item"},
+            "Document Status": {"type": "attribute", "path": "documentStatus", "source": "root"},
+            "Seller": {"type": "xpath", "path": ".//seller/additionalPartyIdentification/additionalPartyIdentificationValue", "source": "root"},
+            "CTRI": {"type": "xpath", "path": ".//additionalPartyIdentification[additionalPartyIdentificationType='FOR_INTERNAL_USE_11']/additionalPartyIdentificationValue", "source": "root"}
+        }
+    }
+
+class ConversionCancelled(Exception):
+    """Dilempar saat konversi dibatalkan pengguna (dicek di antara file)."""
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled is not None and is_cancelled(): raise ConversionCancelled("Konversi dibatalkan.")
+
+# --- BARU: Instrumentasi opsional (waktu per fase/file/kolom). Tanpa objek metrics tidak ada pembungkus sama sekali ---
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _peak_rss_mb():
+    if resource is None: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class ConversionMetrics:
+    """Mengumpulkan waktu per fase, per file dan per kolom profil, jumlah item, tingkat nilai kosong dan puncak memori."""
+    def __init__(self):
+        self.started = time.perf_counter(); self.finished = None; self.items = 0
+        self.phases = defaultdict(float); self.files = {}; self.columns = {}
+    def add_phase(self, phase, seconds): self.phases[phase] += seconds
+    def add_file(self, xml_file, **values):
+        entry = self.files.setdefault(str(xml_file), {})
+        for key, value in values.items(): entry[key] = entry.get(key, 0) + value
+    def _column(self, col_name): return self.columns.setdefault(col_name, {"seconds": 0.0, "values": 0, "empty": 0, "errors": 0})
+    def add_column_time(self, col_names, seconds):
+        # Kolom yang berbagi path dievaluasi sekali; waktunya dibagi rata ke kolom-kolom tersebut
+        share = seconds / len(col_names)
+        for col_name in col_names: self._column(col_name)["seconds"] += share
+    def count_values(self, header, rows):
+        self.items += len(rows)
+        for position, col_name in enumerate(header):
+            stats = self._column(col_name); stats["values"] += len(rows)
+            for row in rows:
+                value = row[position]
+                if value == "": stats["empty"] += 1
+                elif value.startswith("Error:"): stats["errors"] += 1
+    def merge(self, snapshot):
+        """Menggabungkan hasil drain() dari proses worker."""
+        self.items += snapshot["items"]
+        for phase, seconds in snapshot["phases"].items(): self.phases[phase] += seconds
+        for xml_file, values in snapshot["files"].items(): self.add_file(xml_file, **values)
+        for col_name, stats in snapshot["columns"].items():
+            target = self._column(col_name)
+            for key, value in stats.items(): target[key] += value
+    def drain(self):
+        snapshot = {"items": self.items, "phases": dict(self.phases), "files": self.files, "columns": self.columns}
+        self.items = 0; self.phases = defaultdict(float); self.files = {}; self.columns = {}
+        return snapshot
+    def finish(self): self.finished = time.perf_counter()
+    def to_dict(self):
+        total = (self.finished or time.perf_counter()) - self.started
+        return {"total_seconds": round(total, 4), "items": self.items, "items_per_sec": round(self.items / total, 1) if total > 0 else 0.0, "peak_rss_mb": _peak_rss_mb(),
+                "phases": {phase: round(seconds, 4) for phase, seconds in sorted(self.phases.items(), key=lambda kv: -kv[1])},
+                "files": [{"file": xml_file, **{k: round(v, 4) if isinstance(v, float) else v for k, v in values.items()}} for xml_file, values in self.files.items()],
+                "columns": {col_name: {"seconds": round(stats["seconds"], 4), "values": stats["values"], "empty": stats["empty"], "errors": stats["errors"],
+                                       "empty_rate": round(stats["empty"] / stats["values"], 3) if stats["values"] else 0.0} for col_name, stats in self.columns.items()}}
+    def write_json(self, report_path):
+        with open(report_path, "w", encoding="utf-8") as f: json.dump(self.to_dict(), f, indent=4, ensure_ascii=False)
+    def summary(self):
+        report = self.to_dict(); total = report["total_seconds"] or 1e-9
+        return " · ".join(f"{phase} {seconds / total:.0%}" for phase, seconds in report["phases"].items()) + f" · {report['items']} item dalam {total:.2f}s"
+    def summary_table(self, top_columns=10):
+        report = self.to_dict(); total = report["total_seconds"] or 1e-9
+        lines = [f"Total {total:.3f}s, {report['items']} item ({report['items_per_sec']} item/detik), puncak RSS {report['peak_rss_mb']} MB", "", f"{'Fase':<22}{'detik':>10}{'%':>8}"]
+        lines += [f"{phase:<22}{seconds:>10.4f}{seconds / total:>8.1%}" for phase, seconds in report["phases"].items()]
+        lines += ["", f"{'Kolom':<32}{'detik':>10}{'kosong':>9}{'error':>8}"]
+        ranked = sorted(report["columns"].items(), key=lambda kv: -kv[1]["seconds"])[:top_columns]
+        lines += [f"{col_name[:31]:<32}{stats['seconds']:>10.4f}{stats['empty_rate']:>9.1%}{stats['errors']:>8}" for col_name, stats in ranked]
+        # Pada mode paralel waktu proses di worker lebih bermakna daripada jeda di proses utama
+        file_seconds = lambda entry: entry.get("worker_seconds", entry.get("seconds", 0))
+        slow_files = sorted(report["files"], key=lambda entry: -file_seconds(entry))[:5]
+        if slow_files: lines += ["", "File terlambat:"] + [f"  {os.path.basename(entry['file'])}: {file_seconds(entry):.4f}s, {entry.get('items', 0)} item" for entry in slow_files]
+        return "\n".join(lines)
+
+def _timed_iter(iterable, metrics, phase):
+    """Hanya menghitung waktu di dalam next() (mis. parsing), bukan waktu yang dipakai konsumen."""
+    iterator = iter(iterable)
+    while True:
+        started = time.perf_counter()
+        try: value = next(iterator)
+        except StopIteration: metrics.add_phase(phase, time.perf_counter() - started); return
+        metrics.add_phase(phase, time.perf_counter() - started)
+        yield value
+
+def _timed_extractor(extract, col_names, phase, metrics):
+    def timed(element, out):
+        started = time.perf_counter(); extract(element, out); elapsed = time.perf_counter() - started
+        metrics.add_phase(phase, elapsed); metrics.add_column_time(col_names, elapsed)
+    return timed
+
+# --- BARU: Backend XML: ElementTree bawaan, atau lxml dengan XPath terkompilasi per path kolom ---
+XML_BACKENDS = ("auto", "etree", "lxml")
+_NCNAME = r"[A-Za-z_][\w.\-]*"
+_ET_NAME = rf"(?:\{{[^}}]*\}})?(?:{_NCNAME}|\*)"
+_ET_STEP_RE = re.compile(rf"^(\.|{_ET_NAME})((?:\[[^\]]*\])*)$")
+_ET_QUOTED = r"'[^']*'|\"[^\"]*\""
+_ET_ATTR_PRED_RE = re.compile(rf"^@((?:\{{[^}}*]*\}})?{_NCNAME})(?:(!?=)({_ET_QUOTED}))?$")
+_ET_TAG_PRED_RE = re.compile(rf"^(\.|{_ET_NAME})(?:(!?=)({_ET_QUOTED}))?$")
+_ET_POSITION_PRED_RE = re.compile(r"^(?:[1-9]\d*|last\(\)(?:-\d+)?)$")
+
+def _translate_name(name, namespaces):
+    """Nama ElementPath ({uri}tag, {*}tag, {}tag, *) -> (tes node XPath, apakah posisi [n] aman diterjemahkan)."""
+    uri, local = (name[1:].split("}", 1) if name.startswith("{") else (None, name))
+    if uri == "*": return ("*" if local == "*" else f"*[local-name()='{local}']"), False
+    if uri == "": return ("*[namespace-uri()='']" if local == "*" else local), local != "*"
+    if uri is None: return local, local != "*"
+    prefix = namespaces.setdefault(uri, f"ns{len(namespaces)}")
+    return f"{prefix}:{local}", local != "*"
+
+def _translate_step(token, namespaces):
+    """Satu langkah ElementPath -> (XPath, nama ElementTree, punya predikat posisi, punya predikat, tes node tanpa predikat)."""
+    match = _ET_STEP_RE.match(token)
+    if not match: return None
+    name, predicates = match.group(1), re.findall(r"\[([^\]]*)\]", match.group(2))
+    if name == ".": return (".", name, False, False, ".") if not predicates else None
+    test, positional_ok = _translate_name(name, namespaces); parts = [test]; positional = False
+    for position, predicate in enumerate(predicates):
+        if _ET_POSITION_PRED_RE.match(predicate):
+            # ElementTree menghitung posisi di antara semua saudara bertag sama, jadi hanya aman sebagai predikat pertama pada tag biasa
+            if position > 0 or not positional_ok: return None
+            parts.append(f"[{predicate}]"); positional = True; continue
+        attr_match = _ET_ATTR_PRED_RE.match(predicate)
+        if attr_match:
+            attr, op, value = attr_match.groups(); attr_test, _ = _translate_name(attr, namespaces)
+            parts.append(f"[@{attr_test}{op}{value}]" if op else f"[@{attr_test}]"); continue
+        tag_match = _ET_TAG_PRED_RE.match(predicate)
+        if not tag_match: return None
+        tag, op, value = tag_match.groups(); tag_test = "." if tag == "." else _translate_name(tag, namespaces)[0]
+        if tag == "." and not op: return None
+        parts.append(f"[{tag_test}{op}{value}]" if op else f"[{tag_test}]")
+    return "".join(parts), name, positional, bool(predicates), test
+
+def translate_elementpath(path):
+    """Menerjemahkan path ElementPath ke XPath 1.0 dengan urutan hasil yang dijamin sama dengan ElementTree.
+
+    Mengembalikan dict: `all` (semua hasil, urutan dokumen), `namespaces`, dan jika path memakai `//`: `base` (langkah
+    sebelum `//`), `step`/`test`/`positional`/`filtered` (langkah `//` dengan dan tanpa predikat) serta `suffix`
+    (langkah anak sesudahnya, atau None). Mengembalikan None jika path tidak bisa diterjemahkan dengan aman
+    ('..', '//' lebih dari sekali, path absolut, spasi di predikat, dst).
+    """
+    if not path: return None
+    tokens = re.split(r"/(?![^{]*\})", path)
+    if tokens[0] == "" or tokens[-1] == "": return None
+    namespaces = {}; steps = []; descendant_at = None
+    for token in tokens:
+        if token == "":
+            if descendant_at is not None: return None
+            descendant_at = len(steps); continue
+        translated = _translate_step(token, namespaces)
+        if translated is None: return None
+        steps.append(translated)
+    expressions = [step[0] for step in steps]; namespaces = {prefix: uri for uri, prefix in namespaces.items()}
+    if descendant_at is None: return {"all": "/".join(expressions), "namespaces": namespaces}
+    step, name, positional, filtered, test = steps[descendant_at]
+    if name == ".": return None
+    base = "/".join(expressions[:descendant_at])
+    return {"all": f"{base}//{'/'.join(expressions[descendant_at:])}", "namespaces": namespaces, "base": base, "step": step, "test": test,
+            "positional": positional, "filtered": filtered, "suffix": "/".join(expressions[descendant_at + 1:]) or None}
+
+class EtreeBackend:
+    """Perilaku bawaan: xml.etree.ElementTree dengan find/findall (path ElementPath di-cache oleh ElementTree sendiri)."""
+    name = "etree"
+    def parse(self, xml_file): return ET.parse(xml_file).getroot()
+    def iterparse(self, xml_file): return ET.iterparse(xml_file, events=("start", "end"))
+    def compile_find(self, path): return lambda element: element.find(path)
+    def compile_findall(self, path): return lambda element: element.findall(path)
+
+class LxmlBackend:
+    """lxml.etree dengan objek etree.XPath yang dikompilasi sekali per path. Komentar/PI dibuang agar teks elemen sama dengan ElementTree.
+
+    File datang dari luar (portal vendor): entity tidak di-resolve dan akses jaringan dimatikan secara eksplisit (default
+    lxml < 5.0 me-resolve entity eksternal), dan batas ukuran/kedalaman bawaan libxml2 tetap berlaku (tanpa huge_tree).
+    """
+    name = "lxml"
+    def __init__(self):
+        try: from lxml import etree
+        except ImportError: raise ImportError("Backend 'lxml' membutuhkan paket lxml. Pasang dengan: pip install lxml") from None
+        self.etree = etree
+    def parse(self, xml_file):
+        return self.etree.parse(xml_file, self.etree.XMLParser(remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True)).getroot()
+    def iterparse(self, xml_file):
+        return self.etree.iterparse(xml_file, events=("start", "end"), remove_comments=True, remove_pis=True, resolve_entities=False, no_network=True)
+    def _translate(self, path):
+        translated = translate_elementpath(path)
+        if translated is None: return None, None
+        namespaces = translated["namespaces"]
+        def xpath(expression): return self.etree.XPath(expression, namespaces=namespaces, smart_strings=False)
+        try: xpath(translated["all"])
+        except self.etree.XPathSyntaxError: return None, None
+        return translated, xpath
+    def compile_find(self, path):
+        if not path: return lambda element: None
+        translated, xpath = self._translate(path)
+        # Path yang tidak bisa diterjemahkan tetap memakai ElementPath milik lxml
+        if translated is None: return lambda element: element.find(path)
+        suffix = translated.get("suffix")
+        if "step" not in translated: select = xpath(translated["all"])
+        elif translated["positional"]: select = xpath(f"({translated['base']}//{translated['step']}[{suffix}])[1]/{suffix}" if suffix else f"({translated['all']})[1]")
+        elif not suffix and not translated["filtered"]: select = xpath(f"{translated['base']}/descendant::{translated['step']}[1]")
+        else:
+            # libxml2 hanya berhenti di kecocokan pertama untuk descendant::X[1] tanpa predikat lain, jadi kandidat
+            # ditelusuri satu per satu dalam urutan dokumen (descendant::X[1], lalu following::X[1]) seperti ElementTree
+            base = None if translated["base"] == "." else xpath(translated["base"]); test = translated["test"]
+            first_below = xpath(f"descendant::{test}[1]"); first_after = xpath(f"following::{test}[1]")
+            check = xpath(f"self::{translated['step']}[{suffix}]" if suffix else f"self::{translated['step']}"); select_suffix = xpath(suffix) if suffix else None
+            def inside(node, context):
+                while node is not None:
+                    if node is context: return True
+                    node = node.getparent()
+                return False
+            def find(element):
+                for context in (base(element) if base is not None else (element,)):
+                    candidates = first_below(context)
+                    while candidates:
+                        candidate = candidates[0]
+                        if check(candidate): return select_suffix(candidate)[0] if select_suffix is not None else candidate
+                        candidates = first_below(candidate) or first_after(candidate)
+                        if candidates and not inside(candidates[0], context): break
+                return None
+            return find
+        def find(element):
+            found = select(element)
+            return found[0] if found else None
+        return find
+    def compile_findall(self, path):
+        if not path: return lambda element: []
+        translated, xpath = self._translate(path)
+        if translated is None: return lambda element: element.findall(path)
+        full = xpath(translated["all"]); suffix = translated.get("suffix")
+        if not suffix: return full
+        # Urutan ElementTree = hasil dikelompokkan per elemen prefix (urutan dokumen prefix), bukan urutan dokumen.
+        # Keduanya berbeda hanya jika ada elemen prefix yang bersarang di elemen prefix lain; itu terlihat dari dua hasil
+        # berurutan yang konteks keduanya adalah leluhur konteks pertama. Path yang bisa diterjemahkan tidak punya '/'
+        # di dalam string predikat, jadi jumlah langkah suffix aman dihitung dengan split.
+        prefix = xpath(f"{translated['base']}//{translated['step']}"); depth = sum(1 for step in suffix.split("/") if step != ".")
+        def context_of(node):
+            for _ in range(depth): node = node.getparent()
+            return node
+        def findall(element):
+            found = full(element)
+            if len(found) < 2: return found
+            contexts = [node.getparent() for node in found] if depth == 1 else [context_of(node) for node in found]
+            # Jalur cepat: konteks yang semuanya bersaudara (atau sama) tidak mungkin bersarang
+            parent = contexts[0].getparent()
+            if all(context.getparent() is parent for context in contexts): return found
+            previous = contexts[0]
+            for context in contexts[1:]:
+                if context is previous: continue
+                ancestor = previous.getparent()
+                while ancestor is not None and ancestor is not element:
+                    if ancestor is context:
+                        positions = {match: position for position, match in enumerate(prefix(element))}
+                        return [node for _, node in sorted(zip((positions[c] for c in contexts), found), key=lambda pair: pair[0])]
+                    ancestor = ancestor.getparent()
+                previous = context
+            return found
+        return findall
+
+def lxml_available():
+    from importlib.util import find_spec
+    return find_spec("lxml") is not None
+
+def get_xml_backend(name="auto", paths=()):
+    """'auto' memilih lxml jika terpasang dan semua path bisa diterjemahkan ke XPath; selain itu ElementTree."""
+    if name not in XML_BACKENDS: raise ValueError(f"Backend XML '{name}' tidak dikenal (pilihan: {', '.join(XML_BACKENDS)}).")
+    if name == "auto": name = "lxml" if lxml_available() and all(not p or translate_elementpath(p) is not None for p in paths) else "etree"
+    return LxmlBackend() if name == "lxml" else EtreeBackend()
+
+# --- BARU: Input XML dari folder, .zip dan .gz (anggota arsip dialirkan langsung ke parser, tanpa ekstrak ke disk) ---
+MAX_OPEN_ARCHIVES = 8
+_open_zip_files = {}
+
+def _open_zip(archive):
+    # ZipFile dibuka sekali per proses: membaca central directory bundle 50 ribu file untuk tiap anggota akan sangat lambat.
+    # Kunci memuat pid karena worker hasil fork mewarisi handle induk, dan posisi baca file descriptor ikut terbagi.
+    key = (os.getpid(), archive); zip_file = _open_zip_files.get(key)
+    if zip_file is None:
+        if len(_open_zip_files) >= MAX_OPEN_ARCHIVES: _open_zip_files.pop(next(iter(_open_zip_files))).close()
+        zip_file = _open_zip_files[key] = zipfile.ZipFile(archive)
+    return zip_file
+
+def close_archives():
+    for zip_file in _open_zip_files.values(): zip_file.close()
+    _open_zip_files.clear()
+
+class ArchiveMember(str):
+    """Satu file XML di dalam .zip (member = nama anggota) atau .gz (member = None).
+
+    Nilai string-nya adalah nama tampilan `arsip::anggota`, jadi bisa dipakai di mana pun path file biasa dipakai
+    (pesan error, progress, metrics); hanya pembukaan file yang berbeda, lewat open_xml_input().
+    """
+    def __new__(cls, archive, member=None):
+        self = super().__new__(cls, archive if member is None else f"{archive}::{member}")
+        self.archive = archive; self.member = member
+        return self
+    def __getnewargs__(self): return (self.archive, self.member)
+    def open(self): return gzip.open(self.archive, "rb") if self.member is None else _open_zip(self.archive).open(self.member)
+    def stat(self):
+        """(ukuran, mtime_ns) untuk cache: ukuran anggota (atau file .gz) dan mtime arsipnya."""
+        st = os.stat(self.archive)
+        return (st.st_size if self.member is None else _open_zip(self.archive).getinfo(self.member).file_size), st.st_mtime_ns
+
+def open_xml_input(xml_file):
+    """Context manager: file object untuk anggota arsip, path apa adanya untuk file biasa (parser membukanya sendiri)."""
+    return xml_file.open() if isinstance(xml_file, ArchiveMember) else nullcontext(xml_file)
+
+def _input_matches(name, member_glob):
+    # Pola tanpa "/" (mis. "PO_*.xml") dicocokkan ke nama file saja, di folder mana pun dalam arsip/folder input
+    if member_glob: return fnmatch.fnmatchcase((name if "/" in member_glob else name.rsplit("/", 1)[-1]).lower(), member_glob.lower())
+    # Tanpa filter: semua *.xml, kecuali file sampah resource fork dari arsip buatan macOS
+    return name.lower().endswith(".xml") and not name.startswith("__MACOSX/") and not name.rsplit("/", 1)[-1].startswith("._")
+
+def expand_xml_inputs(paths, member_glob=None, errors=None):
+    """Mengembangkan input (file XML, folder, .zip, .gz) menjadi daftar sumber XML dengan urutan deterministik.
+
+    Urutan input dipertahankan; isi folder dan anggota .zip diurutkan per nama. member_glob (mis. "PO_*.xml")
+    menyaring anggota .zip dan isi folder (tanpa membedakan huruf besar/kecil; pola tanpa "/" dicocokkan ke
+    nama file di subfolder mana pun, pola dengan "/" ke path lengkap). Input yang tidak bisa dibaca
+    dicatat ke errors sebagai (path, pesan), atau dilempar sebagai ValueError jika errors None.
+    """
+    sources = []
+    for path in paths:
+        if isinstance(path, ArchiveMember): sources.append(path); continue
+        lower = path.lower()
+        try:
+            if lower.endswith(".zip"):
+                sources.extend(ArchiveMember(path, info.filename) for info in sorted(_open_zip(path).infolist(), key=lambda info: info.filename)
+                               if not info.is_dir() and _input_matches(info.filename, member_glob))
+            elif lower.endswith(".gz"): sources.append(ArchiveMember(path))
+            elif os.path.isdir(path):
+                for dir_path, dir_names, file_names in os.walk(path):
+                    dir_names.sort()
+                    for file_name in sorted(file_names):
+                        full_path = os.path.join(dir_path, file_name); relative = os.path.relpath(full_path, path).replace(os.sep, "/")
+                        if file_name.lower().endswith(".zip"): sources.extend(expand_xml_inputs([full_path], member_glob, errors))
+                        elif _input_matches(relative[:-3] if file_name.lower().endswith(".gz") else relative, member_glob): sources.append(ArchiveMember(full_path) if file_name.lower().endswith(".gz") else full_path)
+            else: sources.append(path)
+        except (OSError, zipfile.BadZipFile) as e:
+            if errors is None: raise ValueError(f"Gagal membaca {path}: {e}") from e
+            errors.append((path, str(e)))
+    return sources
+
+# --- BARU: Mesin streaming (iterparse) untuk XML -> CSV ---
+def _compile_item_steps(item_loop_path):
+    """Mengubah item_loop_path (subset ElementPath) menjadi daftar langkah (axis, tag). None jika tidak didukung streaming."""
+    tokens = re.split(r"/(?![^{]*\})", item_loop_path.strip())
+    if tokens and tokens[0] == "": return None  # path absolut tidak didukung
+    steps = []; axis = "child"
+    for i, token in enumerate(tokens):
+        if token == "":
+            if i == 0 or i == len(tokens) - 1: return None
+            axis = "descendant"; continue
+        if token == ".": continue
+        if token == ".." or "[" in token or "@" in token: return None
+        steps.append((axis, token)); axis = "child"
+    return steps
+
+def _tag_matches(test, tag):
+    if test == "*": return True
+    if test.startswith("{*}"): return tag.split('}')[-1] == test[3:]
+    if test.startswith("{}"): return tag == test[2:]
+    return tag == test
+
+def _steps_match(steps, tags, i=0, j=0):
+    if i == len(steps): return j == len(tags)
+    if j >= len(tags): return False
+    axis, test = steps[i]
+    if axis == "child": return _tag_matches(test, tags[j]) and _steps_match(steps, tags, i + 1, j + 1)
+    return any(_tag_matches(test, tags[k]) and _steps_match(steps, tags, i + 1, k + 1) for k in range(j, len(tags)))
+
+def _iter_items_streaming(xml_file, steps, backend, yielded):
+    # Item yang sudah selesai di-yield lalu dibersihkan dan dilepas dari parent-nya, sehingga memori tetap datar.
+    # Jika elemen yang cocok dengan langkah path yang sama bersarang (mis. <it> di dalam <it>), urutan/isi findall tidak
+    # lagi sama dengan urutan dokumen: generator berhenti dan mengembalikan True agar pemanggil beralih ke parse penuh.
+    # Posisi (urutan start tag) setiap item yang sudah di-yield dicatat di `yielded`.
+    root = None; path = []; open_matches = []; open_levels = [0] * (len(steps) + 1); current = None; current_position = position = -1
+    # Sebagian besar elemen tidak cocok dengan tag langkah mana pun: cukup dicek lewat set jika tidak ada wildcard
+    step_tags = None if any(test == "*" or test.startswith(("{*}", "{}")) for _, test in steps) else {test for _, test in steps}
+    for event, elem in backend.iterparse(xml_file):
+        if event == "start":
+            position += 1
+            if root is None:
+                root = elem
+                if _steps_match(steps, []): current = elem; current_position = position
+                continue
+            path.append(elem)
+            if step_tags is not None and elem.tag not in step_tags: continue
+            levels = (); tags = None
+            for level, (_, test) in enumerate(steps, 1):
+                if not _tag_matches(test, elem.tag): continue
+                if tags is None: tags = [e.tag for e in path]
+                if _steps_match(steps[:level], tags):
+                    if open_levels[level]: return True
+                    levels += (level,)
+            if not levels: continue
+            for level in levels: open_levels[level] += 1
+            open_matches.append((elem, levels))
+            if len(steps) in levels: current = elem; current_position = position
+            continue
+        if elem is current:
+            yielded.append(current_position); yield root, elem
+            current = None
+            if elem is not root:
+                elem.clear(); (path[-2] if len(path) > 1 else root).remove(elem)
+        if elem is not root:
+            path.pop()
+            if open_matches and open_matches[-1][0] is elem:
+                for level in open_matches.pop()[1]: open_levels[level] -= 1
+    return False
+
+def iter_xml_items(xml_file, item_loop_path, streaming=False, backend=None):
+    """Menghasilkan pasangan (root, item) untuk setiap item di file XML.
+
+    Mode streaming memakai iterparse: kolom 'root' harus dievaluasi saat item pertama diterima (header dokumen
+    sudah lengkap), dan setiap item dibersihkan setelah dipakai. Jika item_loop_path memakai predikat/atribut,
+    otomatis kembali ke ET.parse biasa; begitu juga (di tengah file) jika item atau elemen perantaranya bersarang.
+    """
+    if backend is None: backend = EtreeBackend()
+    steps = _compile_item_steps(item_loop_path) if streaming else None
+    yielded = []
+    with open_xml_input(xml_file) as source:
+        if steps is not None:
+            nested = yield from _iter_items_streaming(source, steps, backend, yielded)
+            if not nested: return
+        else: root = backend.parse(source)
+    if steps is not None:
+        with open_xml_input(xml_file) as source: root = backend.parse(source)
+    items = backend.compile_findall(item_loop_path)(root)
+    if yielded:
+        # Item yang sudah di-yield saat streaming harus sama dengan item-item pertama hasil findall, lalu dilanjutkan
+        items = list(items); positions = {elem: position for position, elem in enumerate(e for e in root.iter() if isinstance(e.tag, str))}
+        if [positions[item] for item in items[:len(yielded)]] != yielded:
+            raise ValueError(f"Item '{item_loop_path}' bersarang dengan urutan yang tidak bisa diproses streaming; matikan mode streaming untuk file ini.")
+        items = items[len(yielded):]
+    for item in items: yield root, item
+
+# --- BARU: Penulis CSV bertahap (baris langsung dialirkan ke file, tidak ditumpuk di memori) ---
+DEFAULT_CSV_FLUSH_ROWS = 1000
+DEFAULT_CSV_BUFFER_SIZE = 1024 * 1024
+
+class StreamingCSVWriter:
+    """Menulis baris CSV secara bertahap. Baris ditampung maksimal `flush_rows` sebelum diteruskan ke csv.writer."""
+    def __init__(self, output_csv_file, header, flush_rows=DEFAULT_CSV_FLUSH_ROWS, buffer_size=DEFAULT_CSV_BUFFER_SIZE, metrics=None, preamble=True):
+        self.flush_rows = max(1, int(flush_rows)); self.pending = []; self.row_count = 0; self.metrics = metrics
+        self.file = open(output_csv_file, "w", newline='', encoding='utf-8', buffering=buffer_size); self.writer = csv.writer(self.file)
+        if preamble: self.writer.writerow([f"Conversion Date: {datetime.now().strftime('%Y-%m-%d')}"])
+        self.writer.writerow(header)
+    def write_row(self, row):
+        self.pending.append(row)
+        if len(self.pending) >= self.flush_rows: self.flush()
+    def write_rows(self, rows):
+        for row in rows: self.write_row(row)
+    def flush(self):
+        if not self.pending: return
+        started = time.perf_counter() if self.metrics is not None else 0
+        self.writer.writerows(self.pending); self.row_count += len(self.pending); self.pending.clear()
+        if self.metrics is not None: self.metrics.add_phase("csv_write", time.perf_counter() - started)
+    def close(self):
+        if self.file.closed: return
+        try: self.flush()
+        finally: self.file.close()
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): self.close()
+
+# --- BARU: Output kolumnar bertipe (Parquet lewat pyarrow, opsional). Nilai kosong/tidak valid menjadi null ---
+OUTPUT_FORMATS = ("csv", "parquet")
+DATA_TYPES = ("string", "int", "decimal", "float", "date", "datetime")
+DEFAULT_DECIMAL_SCALE = 2
+DEFAULT_PARQUET_ROW_GROUP_ROWS = 65536
+DEFAULT_PARQUET_COMPRESSION = "zstd"
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError: raise ImportError("Output Parquet membutuhkan paket pyarrow. Pasang dengan: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+DECIMAL_PRECISION = 38
+
+def _check_number_text(value):
+    # int()/float()/Decimal() menerima "1_000" (literal Python), bukan format angka yang wajar di data XML
+    if "_" in value: raise ValueError(f"Angka tidak valid: {value!r}")
+
+def _to_int(value):
+    _check_number_text(value)
+    try: number = int(value)
+    except ValueError:
+        number = Decimal(value)
+        if not number.is_finite() or number != number.to_integral_value(): raise ValueError(f"Bukan bilangan bulat: {value!r}")
+        number = int(number)
+    if not INT64_MIN <= number <= INT64_MAX: raise ValueError(f"Di luar jangkauan int64: {value!r}")
+    return number
+
+def _to_float(value):
+    _check_number_text(value); number = float(value)
+    # NaN/inf (termasuk angka yang meluap menjadi inf) dianggap tidak valid, bukan nilai pengukuran
+    if not math.isfinite(number): raise ValueError(f"Angka tidak valid: {value!r}")
+    return number
+
+def _make_decimal_converter(scale):
+    # Presisi konteks disamakan dengan decimal128(38, scale): nilai yang tidak muat melempar InvalidOperation
+    quantum = Decimal(1).scaleb(-scale); context = Context(prec=DECIMAL_PRECISION)
+    def convert(value):
+        _check_number_text(value); number = Decimal(value)
+        if not number.is_finite(): raise ValueError(f"Angka tidak valid: {value!r}")
+        return number.quantize(quantum, rounding=ROUND_HALF_UP, context=context)
+    return convert
+
+def _to_date(value): return date.fromisoformat(value[:10])
+
+def _to_datetime(value):
+    # Nilai ber-zona waktu disimpan sebagai UTC tanpa zona
+    parsed = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None) if parsed.tzinfo else parsed
+
+def resolve_column_types(config):
+    """Mengembalikan daftar (data_type, scale) per kolom header dari `data_type` di profil (default string)."""
+    column_types = []
+    for col_name, details in config["columns"].items():
+        data_type = details.get("data_type") or "string"
+        if data_type not in DATA_TYPES: raise ValueError(f"Tipe data '{data_type}' pada kolom '{col_name}' tidak dikenal (pilihan: {', '.join(DATA_TYPES)}).")
+        column_types.append((data_type, int(details.get("scale", DEFAULT_DECIMAL_SCALE))))
+    return column_types
+
+def _column_converter(data_type, scale):
+    if data_type == "decimal": return _make_decimal_converter(scale)
+    return {"int": _to_int, "float": _to_float, "date": _to_date, "datetime": _to_datetime}.get(data_type)
+
+def _arrow_type(pa, data_type, scale):
+    if data_type == "decimal": return pa.decimal128(DECIMAL_PRECISION, scale)
+    return {"string": pa.string(), "int": pa.int64(), "float": pa.float64(), "date": pa.date32(), "datetime": pa.timestamp("us")}[data_type]
+
+class StreamingParquetWriter:
+    """Pengganti StreamingCSVWriter untuk Parquet: baris ditampung lalu dikonversi per kolom dan ditulis per row group."""
+    def __init__(self, output_file, header, column_types, row_group_rows=DEFAULT_PARQUET_ROW_GROUP_ROWS, compression=DEFAULT_PARQUET_COMPRESSION, metrics=None):
+        pa, pq = _require_pyarrow(); self.pa = pa
+        self.flush_rows = max(1, int(row_group_rows)); self.pending = []; self.row_count = 0; self.metrics = metrics
+        self.header = list(header); self.invalid_counts = defaultdict(int)
+        self.converters = [_column_converter(data_type, scale) for data_type, scale in column_types]
+        # Tanggal konversi disimpan di metadata file, bukan sebagai baris tambahan seperti pada CSV
+        self.schema = pa.schema([pa.field(col_name, _arrow_type(pa, data_type, scale)) for col_name, (data_type, scale) in zip(self.header, column_types)],
+                                metadata={"conversion_date": datetime.now().strftime('%Y-%m-%d')})
+        self.writer = pq.ParquetWriter(output_file, self.schema, compression=compression)
+    def write_row(self, row):
+        self.pending.append(row); self.row_count += 1
+        if len(self.pending) >= self.flush_rows: self.write_row_group()
+    def write_rows(self, rows):
+        for row in rows: self.write_row(row)
+    def _convert_column(self, position):
+        values = [row[position] for row in self.pending]; convert = self.converters[position]
+        if convert is None: return values
+        converted = []; invalid = 0
+        for value in values:
+            if value == "": converted.append(None); continue
+            try: converted.append(convert(value))
+            except (ValueError, ArithmeticError): converted.append(None); invalid += 1
+        if invalid: self.invalid_counts[self.header[position]] += invalid
+        return converted
+    def flush(self):
+        # flush() per file dari xml_to_csv sengaja diabaikan agar row group tidak kecil-kecil; sisa baris ditulis saat close()
+        pass
+    def write_row_group(self):
+        if not self.pending: return
+        started = time.perf_counter() if self.metrics is not None else 0
+        columns = [self._convert_column(position) for position in range(len(self.header))]
+        if self.metrics is not None: now = time.perf_counter(); self.metrics.add_phase("type_convert", now - started); started = now
+        self.writer.write_table(self.pa.Table.from_arrays([self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)], schema=self.schema))
+        self.pending.clear()
+        if self.metrics is not None: self.metrics.add_phase("parquet_write", time.perf_counter() - started)
+    def close(self):
+        if self.writer is None: return
+        try: self.write_row_group()
+        finally: self.writer.close(); self.writer = None
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): self.close()
+
+def resolve_output_format(output_file, settings, output_format=None):
+    """Format eksplisit > `output_format` di profil > ekstensi file (.parquet) > csv."""
+    output_format = output_format or settings.get("output_format") or ("parquet" if output_file.lower().endswith(".parquet") else "csv")
+    if output_format not in OUTPUT_FORMATS: raise ValueError(f"Format output '{output_format}' tidak dikenal (pilihan: {', '.join(OUTPUT_FORMATS)}).")
+    return output_format
+
+def open_output_writer(output_file, header, config, output_format="csv", flush_rows=DEFAULT_CSV_FLUSH_ROWS, metrics=None):
+    settings = config.get("settings", {})
+    if output_format == "csv": return StreamingCSVWriter(output_file, header, flush_rows, metrics=metrics, preamble=settings.get("csv_preamble", True))
+    return StreamingParquetWriter(output_file, header, resolve_column_types(config), settings.get("parquet_row_group_rows", DEFAULT_PARQUET_ROW_GROUP_ROWS),
+                                  settings.get("parquet_compression", DEFAULT_PARQUET_COMPRESSION), metrics)
+
+@contextmanager
+def atomic_output(output_file):
+    """Memberikan path `<output>.tmp` untuk ditulis; jika blok selesai, file itu menggantikan output sekaligus.
+
+    Jika terjadi error atau konversi dibatalkan, file sementara dihapus dan output lama (jika ada) tidak tersentuh.
+    """
+    tmp_path = f"{output_file}.tmp"
+    try: yield tmp_path
+    except BaseException:
+        try: os.remove(tmp_path)
+        except OSError: pass
+        raise
+    os.replace(tmp_path, output_file)
+
+# --- BARU: Mesin formula aman untuk kolom 'calculated' (di-parse sekali, tanpa eval teks mentah) ---
+_FORMULA_REF_RE = re.compile(r"\{([^{}]+)\}")
+_FORMULA_FUNCTIONS = {"round": round, "abs": abs, "min": min, "max": max, "int": int, "float": float}
+_FORMULA_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq
+)
+_MISSING = object(); _INVALID = object()
+
+def _safe_pow(base, exponent):
+    # Pangkat selalu float: angka terlalu besar menjadi OverflowError, bukan perhitungan integer tanpa batas.
+    # Basis negatif dengan pangkat pecahan (mis. -8 ** 0.5) menghasilkan bilangan kompleks: dianggap gagal.
+    result = float(base) ** float(exponent)
+    if isinstance(result, complex): raise ValueError("Hasil pangkat bukan bilangan real")
+    return result
+
+class _PowToCall(ast.NodeTransformer):
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow): return ast.copy_location(ast.Call(func=ast.Name(id="_pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node)
+        return node
+
+def _parse_formula_number(value):
+    if not value: return _MISSING
+    try: number = float(value)
+    except (ValueError, TypeError): return _INVALID
+    return number if math.isfinite(number) else _MISSING
+
+class CompiledFormula:
+    """Formula seperti '{Total Price}/{Unit Price}' yang di-parse sekali ke AST terbatas (aritmatika, perbandingan, round/abs/min/max)."""
+    def __init__(self, formula):
+        self.formula = formula; self.refs = []; self.code = None
+        def to_placeholder(match):
+            if match.group(1) not in self.refs: self.refs.append(match.group(1))
+            return f"_r{self.refs.index(match.group(1))}"
+        source = _FORMULA_REF_RE.sub(to_placeholder, formula).strip()
+        self.arg_names = [f"_r{i}" for i in range(len(self.refs))]
+        try: tree = ast.parse(source, mode="eval")
+        except SyntaxError: return
+        allowed_names = set(self.arg_names) | set(_FORMULA_FUNCTIONS)
+        for node in ast.walk(tree):
+            if not isinstance(node, _FORMULA_NODES): return
+            if isinstance(node, ast.Name) and node.id not in allowed_names: return
+            if isinstance(node, ast.Call) and (not isinstance(node.func, ast.Name) or node.func.id not in _FORMULA_FUNCTIONS or node.keywords): return
+            if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)): return
+        tree = ast.fix_missing_locations(_PowToCall().visit(tree))
+        self.code = compile(tree, "<formula>", "eval"); self.env = {"__builtins__": {}, "_pow": _safe_pow, **_FORMULA_FUNCTIONS}
+    def _evaluate_numbers(self, numbers):
+        if _INVALID in numbers: return "Error: Invalid number"
+        if self.code is None or _MISSING in numbers: return "Error: Formula failed"
+        try: return f"{eval(self.code, self.env, dict(zip(self.arg_names, numbers))):.2f}"
+        except Exception: return "Error: Formula failed"
+    def evaluate(self, row_data):
+        if row_data is None: return "Error: Data for calc not found"
+        return self._evaluate_numbers([_parse_formula_number(row_data.get(ref)) for ref in self.refs])
+    def evaluate_column(self, columns, row_count):
+        """Mode batch: `columns` memetakan nama kolom -> list nilai; setiap kolom di-parse ke float sekali saja."""
+        if not self.refs: return [self._evaluate_numbers([])] * row_count
+        parsed = [[_parse_formula_number(value) for value in columns.get(ref, ("",) * row_count)] for ref in self.refs]
+        return [self._evaluate_numbers(numbers) for numbers in zip(*parsed)]
+
+@lru_cache(maxsize=256)
+def compile_formula(formula):
+    return CompiledFormula(formula)
+
+# --- BARU: Ekstraksi nilai & kompilasi profil menjadi rencana ekstraksi ---
+def extract_value(base_element, details, current_row_data=None):
+    col_type = details.get("type"); path = details.get("path", "");
+    if base_element is None and col_type != "calculated": return ""
+    if col_type == "xpath": el = base_element.find(path); return el.text.strip() if el is not None and el.text is not None else ""
+    elif col_type == "attribute": return base_element.get(path, "")
+    elif col_type == "xpath_indexed":
+        elements = base_element.findall(path); index = details.get("index", 0)
+        if len(elements) > index and elements[index].text is not None: return elements[index].text.strip()
+        return ""
+    elif col_type == "calculated":
+        return compile_formula(details.get("formula", "")).evaluate(current_row_data)
+    return ""
+
+def _make_find_extractor(find, col_names):
+    def extract(element, out):
+        el = find(element); value = el.text.strip() if el is not None and el.text is not None else ""
+        for col_name in col_names: out[col_name] = value
+    return extract
+
+def _make_findall_extractor(findall, indexed_cols):
+    def extract(element, out):
+        elements = findall(element); count = len(elements)
+        for col_name, index in indexed_cols:
+            out[col_name] = elements[index].text.strip() if count > index and elements[index].text is not None else ""
+    return extract
+
+def _make_attribute_extractor(attr_name, col_names):
+    def extract(element, out):
+        value = element.get(attr_name, "")
+        for col_name in col_names: out[col_name] = value
+    return extract
+
+def _make_constant_extractor(col_names, value=""):
+    def extract(element, out):
+        for col_name in col_names: out[col_name] = value
+    return extract
+
+def _compile_source_extractors(columns, backend):
+    """Mengelompokkan kolom (nama, details) per path: path yang sama cukup dievaluasi sekali per elemen."""
+    find_groups = defaultdict(list); findall_groups = defaultdict(list); attribute_groups = defaultdict(list); constant_cols = []
+    for col_name, details in columns:
+        col_type = details.get("type"); path = details.get("path", "")
+        if col_type == "xpath": find_groups[path].append(col_name)
+        elif col_type == "xpath_indexed": findall_groups[path].append((col_name, details.get("index", 0)))
+        elif col_type == "attribute": attribute_groups[path].append(col_name)
+        else: constant_cols.append(col_name)
+    # Kolom xpath biasa yang path-nya juga dipakai xpath_indexed ikut memakai hasil findall (indeks 0)
+    for path in list(find_groups):
+        if path in findall_groups: findall_groups[path].extend((col_name, 0) for col_name in find_groups.pop(path))
+    # Hasil: pasangan (nama-nama kolom, extractor) agar instrumentasi bisa mencatat waktu per kolom
+    extractors = [(tuple(cols), _make_attribute_extractor(attr, cols)) for attr, cols in attribute_groups.items()]
+    extractors += [(tuple(cols), _make_find_extractor(backend.compile_find(path), cols)) for path, cols in find_groups.items()]
+    extractors += [(tuple(c for c, _ in cols), _make_findall_extractor(backend.compile_findall(path), cols)) for path, cols in findall_groups.items()]
+    if constant_cols: extractors.append((tuple(constant_cols), _make_constant_extractor(constant_cols)))
+    return extractors
+
+def _bind_extractors(extractors, phase, metrics):
+    if metrics is None: return [extract for _, extract in extractors]
+    return [_timed_extractor(extract, col_names, phase, metrics) for col_names, extract in extractors]
+
+FORMULA_BLOCK_ROWS = 512
+
+def _root_changed(first, final):
+    # Nilai yang kosong di akhir file tidak dihitung: elemennya ada di dalam item yang sudah dibersihkan saat streaming
+    return any(value != "" and value != first.get(col_name, "") for col_name, value in final.items())
+
+class ExtractionPlan:
+    """Profil yang sudah dikompilasi sekali per proses: extractor per kolom sudah terikat dan dikelompokkan per sumber."""
+    def __init__(self, config, metrics=None, backend=None):
+        self.config = config; self.metrics = metrics; columns_config = config["columns"]; settings_config = config.get("settings", {})
+        self.header = list(columns_config.keys()); self.item_loop_path = settings_config.get("item_loop_path", ".")
+        if backend is None or isinstance(backend, str):
+            paths = [self.item_loop_path] + [d.get("path", "") for d in columns_config.values() if d.get("type") in ("xpath", "xpath_indexed")]
+            backend = get_xml_backend(backend or settings_config.get("xml_backend", "auto"), paths)
+        self.backend = backend
+        root_extractors = _compile_source_extractors([(c, d) for c, d in columns_config.items() if d.get("source") == "root" and d.get("type") != "calculated"], backend)
+        item_extractors = _compile_source_extractors([(c, d) for c, d in columns_config.items() if d.get("source") == "item" and d.get("type") != "calculated"], backend)
+        self.calculated = [(c, compile_formula(d.get("formula", ""))) for c, d in columns_config.items() if d.get("type") == "calculated"]
+        # Kolom calculated bersumber 'root' tidak punya data baris (perilaku lama dipertahankan)
+        root_calculated = [c for c, d in columns_config.items() if d.get("type") == "calculated" and d.get("source") == "root"]
+        if root_calculated: root_extractors.append((tuple(root_calculated), _make_constant_extractor(root_calculated, "Error: Data for calc not found")))
+        self.root_extractors = _bind_extractors(root_extractors, "extract_root", metrics); self.item_extractors = _bind_extractors(item_extractors, "extract_item", metrics)
+    def extract_root(self, root):
+        root_data = {}
+        for extract in self.root_extractors: extract(root, root_data)
+        return root_data
+    def build_row(self, item, root_data):
+        return self.finish_rows([self.extract_item(item)], root_data)[0]
+    def extract_item(self, item):
+        row_data = {}
+        for extract in self.item_extractors: extract(item, row_data)
+        return row_data
+    def finish_rows(self, block, root_data):
+        """Menghitung kolom calculated per kolom (batch) untuk satu blok baris, lalu menyusun baris sesuai header."""
+        metrics = self.metrics
+        for col_name, formula in self.calculated:
+            started = time.perf_counter() if metrics is not None else 0
+            values = formula.evaluate_column({ref: [row_data.get(ref, "") for row_data in block] for ref in formula.refs}, len(block))
+            for row_data, value in zip(block, values): row_data[col_name] = value
+            if metrics is not None: elapsed = time.perf_counter() - started; metrics.add_phase("formula", elapsed); metrics.add_column_time((col_name,), elapsed)
+        header = self.header; rows = []
+        for row_data in block: row_data.update(root_data); rows.append([row_data.get(h, "") for h in header])
+        if metrics is not None: metrics.count_values(header, rows)
+        return rows
+    def iter_rows(self, xml_file, streaming=False, block_rows=FORMULA_BLOCK_ROWS):
+        root = root_data = None; block = []; items = iter_xml_items(xml_file, self.item_loop_path, streaming, self.backend)
+        if self.metrics is not None: items = _timed_iter(items, self.metrics, "parse")
+        # Streaming: kolom 'root' dibaca saat item pertama selesai, jadi baris ditahan sampai akhir file untuk dicek ulang
+        held = [] if streaming and self.root_extractors else None
+        for root, item in items:
+            # Kolom 'root' cukup di-resolve sekali per file, saat item pertama tiba
+            if root_data is None: root_data = self.extract_root(root)
+            block.append(self.extract_item(item))
+            if len(block) >= block_rows:
+                rows = self.finish_rows(block, root_data); block = []
+                if held is None: yield from rows
+                else: held.extend(rows)
+        if block:
+            rows = self.finish_rows(block, root_data)
+            if held is None: yield from rows
+            else: held.extend(rows)
+        if held is None: return
+        # Nilai root yang baru lengkap setelah item pertama (mis. trailer di akhir dokumen): ulangi dengan parse penuh
+        if root_data is not None and _root_changed(root_data, self.extract_root(root)): yield from self.iter_rows(xml_file, False, block_rows); return
+        yield from held
+
+    def cache_key(self): return profile_cache_key(self.config)
+
+    def __reduce__(self):
+        # Extractor berupa closure tidak bisa di-pickle: kirim konfigurasi saja, kompilasi ulang sekali di proses worker
+        return (_rebuild_plan, (self.config, self.metrics is not None, self.backend.name))
+
+def _rebuild_plan(config, instrumented, backend_name):
+    return ExtractionPlan(config, ConversionMetrics() if instrumented else None, backend_name)
+
+def compile_profile(config, metrics=None, backend=None):
+    return ExtractionPlan(config, metrics, backend)
+
+# --- BARU: Beberapa profil sekaligus dalam satu kali parse per file ---
+class MultiExtractionPlan:
+    """Gabungan beberapa ExtractionPlan yang berbagi satu backend: tiap file di-parse sekali untuk semua profil.
+
+    iter_rows menghasilkan pasangan (indeks_profil, baris); urutan baris per profil sama dengan konversi terpisah.
+    Profil dengan item_loop_path yang sama berbagi satu findall/aliran item. Mode streaming hanya dipakai jika
+    semua profil memakai item_loop_path yang sama; jika tidak, file di-parse utuh sekali.
+    """
+    def __init__(self, configs, metrics=None, backend=None):
+        self.configs = list(configs); self.metrics = metrics
+        if not self.configs: raise ValueError("Tidak ada profil yang dipilih.")
+        if backend is None or isinstance(backend, str):
+            paths = [p for config in self.configs for p in [config.get("settings", {}).get("item_loop_path", ".")] + [d.get("path", "") for d in config["columns"].values() if d.get("type") in ("xpath", "xpath_indexed")]]
+            backend = get_xml_backend(backend or self.configs[0].get("settings", {}).get("xml_backend", "auto"), paths)
+        self.backend = backend; self.plans = [ExtractionPlan(config, metrics, backend) for config in self.configs]
+        self.headers = [plan.header for plan in self.plans]; groups = {}
+        for index, plan in enumerate(self.plans): groups.setdefault(plan.item_loop_path, []).append((index, plan))
+        self.groups = [(path, backend.compile_findall(path), group) for path, group in groups.items()]
+    def _iter_group_rows(self, group, items, block_rows, state=None):
+        root = None; root_data = [None] * len(group); blocks = [[] for _ in group]
+        for root, item in items:
+            for position, (index, plan) in enumerate(group):
+                if root_data[position] is None: root_data[position] = plan.extract_root(root)
+                block = blocks[position]; block.append(plan.extract_item(item))
+                if len(block) >= block_rows:
+                    for row in plan.finish_rows(block, root_data[position]): yield index, row
+                    blocks[position] = []
+        for position, (index, plan) in enumerate(group):
+            if blocks[position]:
+                for row in plan.finish_rows(blocks[position], root_data[position]): yield index, row
+        if state is not None: state.update(root=root, root_data=root_data)
+    def iter_rows(self, xml_file, streaming=False, block_rows=FORMULA_BLOCK_ROWS):
+        if len(self.groups) == 1:
+            path, _, group = self.groups[0]; items = iter_xml_items(xml_file, path, streaming, self.backend)
+            if self.metrics is not None: items = _timed_iter(items, self.metrics, "parse")
+            if not streaming or not any(plan.root_extractors for _, plan in group): yield from self._iter_group_rows(group, items, block_rows); return
+            # Sama seperti ExtractionPlan.iter_rows: baris ditahan sampai kolom 'root' bisa dicek ulang di akhir file
+            state = {}; held = list(self._iter_group_rows(group, items, block_rows, state))
+            if state["root"] is not None and any(first is not None and _root_changed(first, plan.extract_root(state["root"])) for (_, plan), first in zip(group, state["root_data"])):
+                yield from self.iter_rows(xml_file, False, block_rows); return
+            yield from held; return
+        started = time.perf_counter()
+        with open_xml_input(xml_file) as source: root = self.backend.parse(source)
+        if self.metrics is not None: self.metrics.add_phase("parse", time.perf_counter() - started)
+        for _, find_items, group in self.groups:
+            items = ((root, item) for item in find_items(root))
+            if self.metrics is not None: items = _timed_iter(items, self.metrics, "parse")
+            yield from self._iter_group_rows(group, items, block_rows)
+    def cache_key(self):
+        return hashlib.sha1("\n".join(plan.cache_key() for plan in self.plans).encode("utf-8")).hexdigest()
+    def __reduce__(self):
+        return (_rebuild_multi_plan, (self.configs, self.metrics is not None, self.backend.name))
+
+def _rebuild_multi_plan(configs, instrumented, backend_name):
+    return MultiExtractionPlan(configs, ConversionMetrics() if instrumented else None, backend_name)
+
+def compile_profiles(configs, metrics=None, backend=None):
+    return MultiExtractionPlan(configs, metrics, backend)
+
+# --- BARU: Konversi paralel multi-core (ProcessPoolExecutor), urutan output tetap sama dengan urutan file ---
+DEFAULT_CHUNK_SIZE = 8
+_worker_plan = None
+
+def _init_worker(plan):
+    global _worker_plan
+    _worker_plan = plan
+
+def _extract_file_chunk(xml_files, streaming):
+    results = []; metrics = _worker_plan.metrics
+    for xml_file in xml_files:
+        started = time.perf_counter()
+        try: results.append((xml_file, list(_worker_plan.iter_rows(xml_file, streaming)), None))
+        except Exception as e: results.append((xml_file, None, str(e)))
+        if metrics is not None: metrics.add_file(xml_file, worker_seconds=time.perf_counter() - started)
+    return results, metrics.drain() if metrics is not None else None
+
+def resolve_worker_count(workers):
+    workers = int(workers or 1)
+    return (os.cpu_count() or 1) if workers <= 0 else workers
+
+def iter_parallel_file_rows(plan, xml_files, workers, chunk_size=DEFAULT_CHUNK_SIZE, streaming=False):
+    """Menghasilkan (xml_file, rows, error) sesuai urutan input. Jumlah chunk yang sedang diproses dibatasi agar memori tetap terkendali."""
+    from concurrent.futures import ProcessPoolExecutor  # di-import saat dibutuhkan agar CLI cepat start
+    chunk_size = max(1, int(chunk_size)); chunks = iter([xml_files[i:i + chunk_size] for i in range(0, len(xml_files), chunk_size)])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(plan,)) as executor:
+        pending = deque(executor.submit(_extract_file_chunk, chunk, streaming) for chunk in islice(chunks, workers * 2))
+        try:
+            while pending:
+                results, worker_metrics = pending.popleft().result()
+                if worker_metrics is not None: plan.metrics.merge(worker_metrics)
+                next_chunk = next(chunks, None)
+                if next_chunk is not None: pending.append(executor.submit(_extract_file_chunk, next_chunk, streaming))
+                yield from results
+        finally:
+            # Jika konsumen berhenti lebih awal (mis. dibatalkan), chunk yang belum jalan tidak perlu ditunggu
+            for future in pending: future.cancel()
+
+# --- BARU: Cache hasil ekstraksi per file (content-addressed) agar file yang tidak berubah tidak di-parse ulang ---
+CACHE_DIR = ".xmltocsv_cache"
+DEFAULT_CACHE_MAX_MB = 512
+CACHE_FORMAT_VERSION = 1
+# Pengaturan yang tidak memengaruhi isi baris tidak ikut di-hash, supaya mengubahnya tidak membuang cache
+_RUNTIME_SETTINGS = {"csv_flush_rows", "workers", "chunk_size", "cache", "cache_dir", "cache_max_mb", "metrics_report",
+                     "output_format", "csv_preamble", "parquet_compression", "parquet_row_group_rows", "xml_backend", "input_member_glob"}
+# Atribut kolom yang hanya memengaruhi penulisan output (cache menyimpan teks hasil ekstraksi)
+_OUTPUT_COLUMN_KEYS = {"data_type", "scale"}
+
+def profile_cache_key(config):
+    settings = {k: v for k, v in config.get("settings", {}).items() if k not in _RUNTIME_SETTINGS}
+    columns = {c: {k: v for k, v in d.items() if k not in _OUTPUT_COLUMN_KEYS} for c, d in config.get("columns", {}).items()}
+    payload = json.dumps({"version": CACHE_FORMAT_VERSION, "columns": columns, "settings": settings}, sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+class ExtractionCache:
+    """Cache baris hasil ekstraksi di disk: <cache_dir>/<hash profil>/<hash isi file>.json, dengan batas ukuran dan eviksi LRU."""
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir; self.max_bytes = max_bytes; self.index_path = os.path.join(cache_dir, "files.json"); self.index_dirty = False
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f: self.file_index = json.load(f)
+        except (OSError, ValueError): self.file_index = {}
+    def file_key(self, xml_file):
+        """Hash isi file. Jika ukuran + mtime sama dengan catatan sebelumnya, hash lama dipakai tanpa membaca file."""
+        is_member = isinstance(xml_file, ArchiveMember)
+        try: size, mtime_ns = xml_file.stat() if is_member else (lambda st: (st.st_size, st.st_mtime_ns))(os.stat(xml_file))
+        except (OSError, KeyError, zipfile.BadZipFile): return None
+        path = f"{os.path.abspath(xml_file.archive)}::{xml_file.member}" if is_member else os.path.abspath(xml_file); known = self.file_index.get(path)
+        if known and known[0] == size and known[1] == mtime_ns: return known[2]
+        digest = hashlib.sha1()
+        try:
+            with (xml_file.open() if is_member else open(xml_file, 'rb')) as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""): digest.update(block)
+        except (OSError, zipfile.BadZipFile): return None
+        self.file_index[path] = [size, mtime_ns, digest.hexdigest()]; self.index_dirty = True
+        return digest.hexdigest()
+    def _entry_path(self, profile_key, file_key): return os.path.join(self.cache_dir, profile_key, f"{file_key}.json")
+    def has(self, profile_key, file_key): return file_key is not None and os.path.exists(self._entry_path(profile_key, file_key))
+    def get(self, profile_key, file_key):
+        if file_key is None: return None
+        entry_path = self._entry_path(profile_key, file_key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f: rows = json.load(f)
+            os.utime(entry_path)  # tandai baru dipakai (LRU)
+            return rows
+        except (OSError, ValueError): return None
+    def put(self, profile_key, file_key, rows):
+        if file_key is None: return
+        entry_path = self._entry_path(profile_key, file_key); tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(rows, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_path, entry_path)
+        except OSError: pass
+    def invalidate_profile(self, config):
+        shutil.rmtree(os.path.join(self.cache_dir, profile_cache_key(config)), ignore_errors=True)
+    def evict(self):
+        entries = []
+        for dir_path, _, file_names in os.walk(self.cache_dir):
+            for name in file_names:
+                if dir_path == self.cache_dir: continue
+                path = os.path.join(dir_path, name)
+                try: st = os.stat(path)
+                except OSError: continue
+                entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes: break
+            try: os.remove(path); total -= size
+            except OSError: pass
+    def close(self):
+        if self.index_dirty:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True); tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(self.file_index, f)
+                os.replace(tmp_path, self.index_path); self.index_dirty = False
+            except OSError: pass
+        if os.path.isdir(self.cache_dir): self.evict()
+
+def open_extraction_cache(settings_config):
+    if not settings_config.get("cache", False): return None
+    return ExtractionCache(settings_config.get("cache_dir", CACHE_DIR), int(settings_config.get("cache_max_mb", DEFAULT_CACHE_MAX_MB)) * 1024 * 1024)
+
+def _serial_file_rows(plan, xml_file, streaming, materialize, report_errors):
+    # Anggota arsip selalu dilaporkan per anggota (seperti mode paralel): satu anggota rusak tidak menggagalkan seluruh bundle
+    if not report_errors and not isinstance(xml_file, ArchiveMember): return xml_file, list(plan.iter_rows(xml_file, streaming)) if materialize else plan.iter_rows(xml_file, streaming), None
+    # Baris satu file ditampung dulu agar file yang gagal di tengah jalan tidak meninggalkan sebagian barisnya di output
+    try: return xml_file, list(plan.iter_rows(xml_file, streaming)), None
+    except Exception as e: return xml_file, None, str(e)
+
+def iter_file_rows(plan, xml_files, streaming=False, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, cache=None, report_errors=False):
+    """Menghasilkan (xml_file, rows, error) sesuai urutan input. File yang ada di cache tidak di-parse sama sekali.
+
+    Di mode paralel, untuk anggota arsip, dan jika report_errors True, error dilaporkan per file lalu file berikutnya
+    tetap diproses. Selain itu (mode serial biasa) error parsing langsung dilempar dan rows bersifat lazy.
+    """
+    profile_key = plan.cache_key() if cache is not None else None
+    file_keys = [cache.file_key(f) for f in xml_files] if cache is not None else [None] * len(xml_files)
+    hits = [cache is not None and cache.has(profile_key, key) for key in file_keys]
+    misses = [f for f, hit in zip(xml_files, hits) if not hit]
+    if workers > 1 and len(misses) > 1: computed = iter_parallel_file_rows(plan, misses, workers, chunk_size, streaming)
+    else: computed = (_serial_file_rows(plan, f, streaming, cache is not None, report_errors) for f in misses)
+    try:
+        for xml_file, file_key, hit in zip(xml_files, file_keys, hits):
+            if hit:
+                rows = cache.get(profile_key, file_key)
+                if rows is None: rows = list(plan.iter_rows(xml_file, streaming)); cache.put(profile_key, file_key, rows)
+                yield xml_file, rows, None; continue
+            xml_file, rows, error = next(computed)
+            if cache is not None and error is None: cache.put(profile_key, file_key, rows)
+            yield xml_file, rows, error
+    finally: computed.close()
+
+# --- BARU: CSV -> XML dengan builder terkompilasi, mode streaming untuk CSV terurut, dan penulisan paralel ---
+DEFAULT_SORT_RUN_ROWS = 50000
+
+def _compile_insert_path(path_str):
+    steps = []
+    for part in path_str.strip("./").split("/"):
+        tag_name = part; predicate = ()
+        if '[' in part and part.endswith(']'):
+            tag_name = part.split('[', 1)[0]
+            pred_str = part[len(tag_name)+1:-1]
+            if '=' in pred_str:
+                attr_name, attr_val = pred_str.split('=', 1)
+                predicate = ((attr_name.strip().lstrip('@'), attr_val.strip("'\"")),)
+        steps.append((tag_name, predicate))
+    return steps
+
+class XMLElementBuilder:
+    """Path kolom profil dikompilasi sekali menjadi langkah (tag, predikat); anak elemen dicari lewat indeks per tag, bukan findall berulang."""
+    def __init__(self, config):
+        self.config = config; settings = config.get("settings", {}); columns = config.get("columns", {})
+        self.root_name = settings.get("root_element_name", "root")
+        self.item_tag = settings.get("item_loop_path", ".//item").split('/')[-1]
+        self.root_columns = self._compile_columns(columns, "root"); self.item_columns = self._compile_columns(columns, "item")
+    @staticmethod
+    def _compile_columns(columns, source):
+        compiled = []
+        for col_name, details in columns.items():
+            if details.get("source") != source or details.get("type") == "calculated": continue
+            col_type = details.get("type"); path_str = details.get("path", "")
+            if col_type == "attribute": compiled.append((col_name, path_str, None))
+            elif col_type in ["xpath", "xpath_indexed"]: compiled.append((col_name, None, _compile_insert_path(path_str)))
+        return compiled
+    @staticmethod
+    def _insert(base_element, attr_name, steps, value, children):
+        if value is None or str(value).strip() == '': return
+        if attr_name is not None: base_element.set(attr_name, str(value)); return
+        current_el = base_element
+        for tag_name, predicate in steps:
+            siblings = children.setdefault(current_el, {}).setdefault(tag_name, [])
+            found_el = next((child for child in siblings if all(child.get(k) == v for k, v in predicate)), None)
+            if found_el is None:
+                found_el = ET.SubElement(current_el, tag_name, dict(predicate)); siblings.append(found_el)
+            current_el = found_el
+        current_el.text = str(value)
+    def build(self, items):
+        root_el = ET.Element(self.root_name); children = {}
+        first_item_data = items[0]
+        for col_name, attr_name, steps in self.root_columns: self._insert(root_el, attr_name, steps, first_item_data.get(col_name), children)
+        for item_data in items:
+            item_el = ET.SubElement(root_el, self.item_tag)
+            for col_name, attr_name, steps in self.item_columns: self._insert(item_el, attr_name, steps, item_data.get(col_name), children)
+        return ET.ElementTree(root_el)
+    def write_group(self, group_id, items, output_dir):
+        tree = self.build(items)
+        ET.indent(tree, space="  ", level=0)
+        safe_group_id = "".join(c for c in group_id if c.isalnum() or c in (' ', '.', '_')).rstrip()
+        output_filename = os.path.join(output_dir, f"{safe_group_id}.xml")
+        tree.write(output_filename, encoding='utf-8', xml_declaration=True)
+        return output_filename
+    def __reduce__(self): return (XMLElementBuilder, (self.config,))
+
+def iter_csv_rows(csv_file_path, group_key):
+    with open(csv_file_path, mode='r', encoding='utf-8') as f:
+        first_line = f.readline()
+        if not first_line.startswith("Conversion Date"):
+            f.seek(0)
+        reader = csv.DictReader(f)
+        if group_key not in reader.fieldnames:
+            raise ValueError(f"Kolom '{group_key}' untuk pengelompokan tidak ditemukan di file CSV.")
+        yield from reader
+
+def iter_contiguous_csv_groups(csv_file_path, group_key, rows=None):
+    """Untuk CSV yang sudah terurut per grup: setiap grup dilepas begitu kunci berganti, jadi memori hanya sebesar satu grup."""
+    seen = set()
+    rows = iter_csv_rows(csv_file_path, group_key) if rows is None else rows
+    for key_value, group_rows in groupby((row for row in rows if row.get(group_key)), key=lambda row: row[group_key]):
+        if key_value in seen: raise ValueError(f"CSV tidak terurut berdasarkan '{group_key}' (nilai '{key_value}' muncul lagi). Aktifkan csv_external_sort.")
+        seen.add(key_value)
+        yield key_value, list(group_rows)
+
+def iter_sorted_csv_groups(csv_file_path, group_key, run_rows=DEFAULT_SORT_RUN_ROWS):
+    """External sort: baris dibagi ke run terurut di file sementara lalu di-merge, urutan asli dalam satu grup dipertahankan."""
+    with tempfile.TemporaryDirectory(prefix="xmltocsv_sort_") as tmp_dir:
+        rows = iter_csv_rows(csv_file_path, group_key); fieldnames = None; run_paths = []; seq = 0
+        while True:
+            run = []; consumed = 0
+            for row in islice(rows, run_rows):
+                if fieldnames is None: fieldnames = [name for name in row if name is not None]
+                if row.get(group_key): run.append((row[group_key], seq, [row.get(name) or "" for name in fieldnames]))
+                seq += 1; consumed += 1
+            if run:
+                run.sort(key=lambda entry: (entry[0], entry[1]))
+                run_path = os.path.join(tmp_dir, f"run_{len(run_paths)}.csv"); run_paths.append(run_path)
+                with open(run_path, "w", newline='', encoding='utf-8') as f: csv.writer(f).writerows([key, seq_no, *values] for key, seq_no, values in run)
+            if consumed < run_rows: break
+        run_files = [open(run_path, "r", newline='', encoding='utf-8') for run_path in run_paths]
+        try:
+            merged = heapq.merge(*(((r[0], int(r[1]), r[2:]) for r in csv.reader(f)) for f in run_files), key=lambda entry: (entry[0], entry[1]))
+            yield from iter_contiguous_csv_groups(csv_file_path, group_key, (dict(zip(fieldnames, values)) for _, _, values in merged))
+        finally:
+            for f in run_files: f.close()
+
+_worker_builder = None
+
+def _init_xml_worker(builder):
+    global _worker_builder
+    _worker_builder = builder
+
+def _write_group_worker(group_id, items, output_dir):
+    _worker_builder.write_group(group_id, items, output_dir)
+
+def iter_written_groups(builder, groups, output_dir, workers=1):
+    """Menulis setiap grup ke file XML-nya dan menghasilkan (group_id, items) setelah file tertulis."""
+    if workers <= 1:
+        for group_id, items in groups: builder.write_group(group_id, items, output_dir); yield group_id, items
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_xml_worker, initargs=(builder,)) as executor:
+        pending = deque()
+        try:
+            for group_id, items in groups:
+                pending.append((group_id, items, executor.submit(_write_group_worker, group_id, items, output_dir)))
+                while len(pending) >= workers * 4:
+                    done_id, done_items, future = pending.popleft(); future.result(); yield done_id, done_items
+            while pending:
+                done_id, done_items, future = pending.popleft(); future.result(); yield done_id, done_items
+        finally:
+            for _, _, future in pending: future.cancel()
+
+# --- BARU: Deteksi skema multi-file (iterparse + trie path + statistik frekuensi) ---
+DEFAULT_DETECTION_SAMPLE = 200
+MAX_INDEXED_SUGGESTIONS = 10
+
+def path_to_col_name(path):
+    name = path.split('/')[-1].replace('@', ''); return name.replace('_', ' ').title()
+
+def recursive_detect(element, current_path, paths):
+    """Deteksi path satu dokumen (cara lama, dipakai sebagai pembanding di benchmark)."""
+    for attr_name in element.attrib: paths.add(f"{current_path}/@{attr_name}")
+    if element.text and element.text.strip(): paths.add(current_path)
+    for child in element: recursive_detect(child, current_path + "/" + child.tag.split('}')[-1], paths)
+
+class _PathNode:
+    __slots__ = ("tag", "parent", "children", "attributes", "count", "text_count", "docs", "last_doc", "max_in_parent")
+    def __init__(self, tag, parent):
+        self.tag = tag; self.parent = parent; self.children = {}; self.attributes = {}
+        self.count = 0; self.text_count = 0; self.docs = 0; self.last_doc = -1; self.max_in_parent = 0
+    def tags_from(self, ancestor):
+        tags = []; node = self
+        while node is not ancestor: tags.append(node.tag); node = node.parent
+        return tags[::-1]
+    def iter_nodes(self):
+        yield self
+        for child in self.children.values(): yield from child.iter_nodes()
+
+class SchemaDetector:
+    """Mengumpulkan path elemen/atribut dari banyak file XML ke dalam trie, beserta frekuensi dan jumlah pengulangannya."""
+    def __init__(self):
+        self.top = _PathNode(None, None); self.files = 0; self.errors = []; self._next_doc = 0
+    def add_file(self, xml_source):
+        doc_id = self._next_doc; self._next_doc += 1; stack = [(self.top, {})]
+        try:
+            with open_xml_input(xml_source) as source:
+                for event, elem in ET.iterparse(source, events=("start", "end")):
+                    if event == "start":
+                        parent, counts = stack[-1]; tag = elem.tag.split('}')[-1]
+                        counts[tag] = counts.get(tag, 0) + 1
+                        node = parent.children.get(tag)
+                        if node is None: node = parent.children[tag] = _PathNode(tag, parent)
+                        node.count += 1
+                        if node.last_doc != doc_id: node.docs += 1; node.last_doc = doc_id
+                        for attr_name in elem.attrib: attr_name = attr_name.split('}')[-1]; node.attributes[attr_name] = node.attributes.get(attr_name, 0) + 1
+                        stack.append((node, {}))
+                    else:
+                        node, counts = stack.pop()
+                        if elem.text and elem.text.strip(): node.text_count += 1
+                        for tag, n in counts.items():
+                            child = node.children[tag]
+                            if n > child.max_in_parent: child.max_in_parent = n
+                        elem.clear()
+        except (ET.ParseError, OSError, zipfile.BadZipFile) as e: self.errors.append((xml_source, str(e))); return
+        self.files += 1
+    def add_files(self, xml_files, sample_size=DEFAULT_DETECTION_SAMPLE, seed=None):
+        if sample_size and len(xml_files) > sample_size: xml_files = random.Random(seed).sample(list(xml_files), sample_size)
+        for xml_file in xml_files: self.add_file(xml_file)
+    def document_root(self):
+        return max(self.top.children.values(), key=lambda node: node.count, default=None)
+    def find_item_node(self, item_loop_path=None):
+        """Node item sesuai item_loop_path jika cocok; jika tidak, elemen berulang terluar dengan jumlah kemunculan terbanyak."""
+        root = self.document_root()
+        if root is None: return None
+        steps = _compile_item_steps(item_loop_path) if item_loop_path else None
+        if steps is not None:
+            for node in root.iter_nodes():
+                if _steps_match(steps, node.tags_from(root)): return node
+        candidates = []
+        for node in root.iter_nodes():
+            if node is root or node.max_in_parent <= 1: continue
+            ancestor = node.parent
+            while ancestor is not root and ancestor.max_in_parent <= 1: ancestor = ancestor.parent
+            if ancestor is root: candidates.append(node)
+        return max(candidates, key=lambda node: node.count, default=root)
+    def proposed_item_loop_path(self, item_loop_path=None):
+        root = self.document_root(); item = self.find_item_node(item_loop_path)
+        if item is None or item is root: return "."
+        return "./" + "/".join(item.tags_from(root))
+    def suggestions(self, item_loop_path=None):
+        """Daftar usulan kolom (dict seperti default_details di MappingDialog) beserta teks statistik per path."""
+        root = self.document_root(); item = self.find_item_node(item_loop_path); result = []
+        if root is None: return result
+        def stats(node, repeats=None):
+            text = f"{node.docs}/{self.files} file, {node.count / max(node.docs, 1):.1f}x/file"
+            return text + (f", maks {repeats}x/item" if repeats is not None else "")
+        for node in root.iter_nodes():
+            in_item = item is not root and (node is item or item in _ancestors(node))
+            base = item if in_item else root; source = "item" if in_item else "root"
+            rel_tags = node.tags_from(base); rel_path = "./" + "/".join(rel_tags) if rel_tags else "."
+            repeats = 1; ancestor = node
+            while ancestor is not base: repeats *= max(ancestor.max_in_parent, 1); ancestor = ancestor.parent
+            for attr_name in node.attributes:
+                path = attr_name if node is base else f"{rel_path}/@{attr_name}"
+                result.append({"col_name": path_to_col_name(attr_name), "type": "attribute", "path": path, "source": source, "stats": stats(node, repeats if in_item else None)})
+            if not node.text_count or node is base: continue
+            if repeats > 1:
+                for index in range(min(repeats, MAX_INDEXED_SUGGESTIONS)):
+                    result.append({"col_name": f"{path_to_col_name(rel_path)} {index + 1}", "type": "xpath_indexed", "path": rel_path, "index": index, "source": source, "stats": stats(node, repeats if in_item else None)})
+            else: result.append({"col_name": path_to_col_name(rel_path), "type": "xpath", "path": rel_path, "source": source, "stats": stats(node, repeats if in_item else None)})
+        return result
+
+def _ancestors(node):
+    node = node.parent
+    while node is not None: yield node; node = node.parent
+
+# --- BARU: Fungsi konversi tingkat atas (dipakai GUI dan CLI) ---
+def load_profile(profile_path):
+    with open(profile_path, 'r', encoding='utf-8') as f: return json.load(f)
+
+def load_profiles(profile_dir=PROFILE_DIR, names=None):
+    """Daftar (nama, config) profil di profile_dir, urut nama seperti daftar profil di GUI. names membatasi ke profil tertentu (dengan/tanpa ekstensi)."""
+    if names is None: file_names = sorted(f for f in os.listdir(profile_dir) if f.endswith(PROFILE_EXTENSION))
+    else: file_names = [n if n.endswith(PROFILE_EXTENSION) else n + PROFILE_EXTENSION for n in names]
+    return [(os.path.splitext(f)[0], load_profile(os.path.join(profile_dir, f))) for f in file_names]
+
+def xml_to_csv(xml_files, output_csv_file, config, streaming=None, flush_rows=None, workers=None, chunk_size=None, errors=None, progress=None, is_cancelled=None, metrics=None, output_format=None, backend=None, member_glob=None):
+    """Mengonversi file-file XML ke satu CSV (atau Parquet, lihat resolve_output_format) sesuai profil. Mengembalikan jumlah baris yang ditulis.
+
+    Opsi yang bernilai None diambil dari bagian `settings` profil. progress(files_done, files_total, rows_done)
+    dipanggil setelah setiap file; is_cancelled() dicek di antara file. Jika metrics (ConversionMetrics) diberikan,
+    waktu per fase/file/kolom ikut dicatat. backend: 'auto', 'etree' atau 'lxml' (default dari `xml_backend`).
+    xml_files boleh berisi folder, .zip dan .gz (lihat expand_xml_inputs; filter anggota default dari `input_member_glob`).
+    """
+    settings_config = config["settings"]
+    if streaming is None: streaming = settings_config.get("streaming", False)
+    if flush_rows is None: flush_rows = settings_config.get("csv_flush_rows", DEFAULT_CSV_FLUSH_ROWS)
+    workers = resolve_worker_count(settings_config.get("workers", 1) if workers is None else workers)
+    if chunk_size is None: chunk_size = settings_config.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    output_format = resolve_output_format(output_csv_file, settings_config, output_format)
+    if member_glob is None: member_glob = settings_config.get("input_member_glob")
+    plan = compile_profile(config, metrics, backend); failed_files = []
+    xml_files = expand_xml_inputs(xml_files, member_glob, failed_files); cache = open_extraction_cache(settings_config)
+    try:
+        with atomic_output(output_csv_file) as tmp_path, open_output_writer(tmp_path, plan.header, config, output_format, flush_rows, metrics) as writer:
+            # Jika errors diberikan (atau mode paralel): file yang gagal dilaporkan per file, sisa batch tetap diproses
+            file_started = time.perf_counter(); rows_before = 0
+            for files_done, (xml_file, rows, error) in enumerate(iter_file_rows(plan, xml_files, streaming, workers, chunk_size, cache, errors is not None), 1):
+                _check_cancelled(is_cancelled)
+                if error is not None: failed_files.append((xml_file, error))
+                else: writer.write_rows(rows); writer.flush()
+                if metrics is not None:
+                    # Waktu per file = jeda antar hasil di proses utama (pada mode paralel lihat juga worker_seconds)
+                    now = time.perf_counter(); metrics.add_file(xml_file, seconds=now - file_started, items=writer.row_count - rows_before, failed=int(error is not None))
+                    file_started = now; rows_before = writer.row_count
+                if progress: progress(files_done, len(xml_files), writer.row_count)
+            if failed_files and errors is None: raise ValueError("Gagal memproses file:\n" + "\n".join(f"{os.path.basename(f)}: {e}" for f, e in failed_files))
+    finally:
+        if cache is not None: cache.close()
+        if metrics is not None: metrics.finish()
+        close_archives()
+    if failed_files: errors.extend(failed_files)
+    return writer.row_count
+
+def xml_to_csv_multi(xml_files, jobs, streaming=None, flush_rows=None, workers=None, chunk_size=None, errors=None, progress=None, is_cancelled=None, metrics=None, backend=None, member_glob=None):
+    """Seperti xml_to_csv, tetapi untuk beberapa profil sekaligus: jobs = [(config, output_file), ...].
+
+    Setiap file XML di-parse sekali dan semua profil dievaluasi pada pohon/aliran item yang sama, jadi total waktunya
+    mendekati satu konversi. Format output ditentukan per profil; opsi lain yang bernilai None (streaming, workers,
+    cache, ...) diambil dari settings profil pertama. Mengembalikan daftar jumlah baris per job.
+    """
+    if not jobs: raise ValueError("Tidak ada profil yang dipilih.")
+    settings_config = jobs[0][0].get("settings", {})
+    if streaming is None: streaming = settings_config.get("streaming", False)
+    if flush_rows is None: flush_rows = settings_config.get("csv_flush_rows", DEFAULT_CSV_FLUSH_ROWS)
+    workers = resolve_worker_count(settings_config.get("workers", 1) if workers is None else workers)
+    if chunk_size is None: chunk_size = settings_config.get("chunk_size", DEFAULT_CHUNK_SIZE)
+    if member_glob is None: member_glob = settings_config.get("input_member_glob")
+    output_formats = [resolve_output_format(output_file, config.get("settings", {})) for config, output_file in jobs]
+    plan = compile_profiles([config for config, _ in jobs], metrics, backend); failed_files = []
+    xml_files = expand_xml_inputs(xml_files, member_glob, failed_files); cache = open_extraction_cache(settings_config)
+    try:
+        with ExitStack() as stack:
+            # Semua output ditulis ke file sementara dulu; writer ditutup (urutan keluar ExitStack) sebelum file-file itu dipindahkan
+            tmp_paths = [stack.enter_context(atomic_output(output_file)) for _, output_file in jobs]
+            writers = [stack.enter_context(open_output_writer(tmp_path, header, config, output_format, flush_rows, metrics))
+                       for (config, _), tmp_path, header, output_format in zip(jobs, tmp_paths, plan.headers, output_formats)]
+            file_started = time.perf_counter(); rows_before = 0
+            for files_done, (xml_file, rows, error) in enumerate(iter_file_rows(plan, xml_files, streaming, workers, chunk_size, cache, errors is not None), 1):
+                _check_cancelled(is_cancelled)
+                if error is not None: failed_files.append((xml_file, error))
+                else:
+                    for index, row in rows: writers[index].write_row(row)
+                    for writer in writers: writer.flush()
+                rows_done = sum(writer.row_count for writer in writers)
+                if metrics is not None:
+                    now = time.perf_counter(); metrics.add_file(xml_file, seconds=now - file_started, items=rows_done - rows_before, failed=int(error is not None))
+                    file_started = now; rows_before = rows_done
+                if progress: progress(files_done, len(xml_files), rows_done)
+            if failed_files and errors is None: raise ValueError("Gagal memproses file:\n" + "\n".join(f"{os.path.basename(f)}: {e}" for f, e in failed_files))
+    finally:
+        if cache is not None: cache.close()
+        if metrics is not None: metrics.finish()
+        close_archives()
+    if failed_files: errors.extend(failed_files)
+    return [writer.row_count for writer in writers]
+
+def csv_to_xml(csv_file_path, output_dir, config, progress=None, is_cancelled=None, input_sorted=None, external_sort=None, workers=None, metrics=None):
+    """Membuat satu file XML per nilai `xml_grouping_key` di output_dir. Mengembalikan jumlah file yang dibuat."""
+    settings = config.get("settings", {})
+    group_key = settings.get("xml_grouping_key")
+    if not group_key: raise ValueError("`xml_grouping_key` tidak diatur di profil.")
+    if input_sorted is None: input_sorted = settings.get("csv_input_sorted", False)
+    if external_sort is None: external_sort = settings.get("csv_external_sort", False)
+    workers = resolve_worker_count(settings.get("workers", 1) if workers is None else workers)
+    builder = XMLElementBuilder(config)
+
+    if external_sort: groups = iter_sorted_csv_groups(csv_file_path, group_key); group_total = 0
+    elif input_sorted: groups = iter_contiguous_csv_groups(csv_file_path, group_key); group_total = 0
+    else:
+        # Mode lama: semua baris dikelompokkan di memori (urutan grup = urutan kemunculan pertama)
+        started = time.perf_counter(); grouped_data = defaultdict(list)
+        for row in iter_csv_rows(csv_file_path, group_key):
+            key_value = row.get(group_key)
+            if key_value: grouped_data[key_value].append(row)
+        groups = iter(grouped_data.items()); group_total = len(grouped_data)
+        if metrics is not None: metrics.add_phase("csv_read", time.perf_counter() - started)
+
+    source = groups
+    if metrics is not None: groups = _timed_iter(groups, metrics, "csv_read")
+    file_count = 0; row_count = 0
+    written = iter_written_groups(builder, groups, output_dir, workers)
+    try:
+        while True:
+            if metrics is not None: started = time.perf_counter(); read_before = metrics.phases["csv_read"]
+            try: group_id, items = next(written)
+            except StopIteration: break
+            if metrics is not None:
+                # Waktu membaca CSV yang terjadi di dalam next() dikurangkan agar tidak terhitung dua kali
+                elapsed = time.perf_counter() - started - (metrics.phases["csv_read"] - read_before)
+                metrics.add_phase("xml_write", elapsed); metrics.add_file(group_id, seconds=elapsed, items=len(items)); metrics.items += len(items)
+            _check_cancelled(is_cancelled)
+            file_count += 1; row_count += len(items)
+            if progress: progress(file_count, group_total, row_count)
+    finally:
+        written.close()
+        if hasattr(source, "close"): source.close()
+        if metrics is not None: metrics.finish()
+    return file_count